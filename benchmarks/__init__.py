@@ -0,0 +1,11 @@
+"""
+Benchmark suite for pyjson, run from the repository root:
+
+    python -m benchmarks run --out before.json
+    python -m benchmarks run --out after.json
+    python -m benchmarks compare before.json after.json
+
+Scenarios compare one code path with the one it replaced:
+
+    python -m benchmarks scenario load
+"""
@@ -0,0 +1,103 @@
+"""
+    python -m benchmarks run [--scale S] [--repeat N] [--case NAME...] [--out FILE]
+    python -m benchmarks compare OLD NEW [--threshold T]
+    python -m benchmarks scenario NAME... [--scale S]
+    python -m benchmarks parity [--scale S] [--seed N]
+
+compare exits with status 1 when anything regressed,
+parity when NativeLexer and FastLexer differ or the
+cppjson library is not built.
+"""
+from .compare import compare
+from .scenarios import SCENARIOS
+from .parity import parity
+from pyjson import native
+from .corpus import CASES
+from .run import run
+import argparse
+import json
+import sys
+
+
+def _report(name: str, case: dict) -> None:
+    megabytes = case["bytes"] / 1e6
+    print(f"{name:8} {case['documents']:6} docs {megabytes:8.3f} MB", file=sys.stderr)
+    for phase, seconds in case["seconds"].items():
+        rate = megabytes / seconds if seconds else float("inf")
+        print(f"    {phase:11} {seconds * 1e3:10.2f} ms {rate:8.2f} MB/s", file=sys.stderr)
+    for name, peak in case["peak"].items():
+        print(f"    {name:11} {peak / 1e6:10.2f} MB peak", file=sys.stderr)
+
+
+def _run(args: argparse.Namespace) -> int:
+    results = run(args.scale, args.repeat, args.seed, args.case, _report)
+    if args.out is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.out, "w") as fp:
+            json.dump(results, fp, indent=2)
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    with open(args.old) as old, open(args.new) as new:
+        changes = compare(json.load(old), json.load(new), args.threshold)
+    for change in changes:
+        flag = "REGRESSED" if change.regressed else ""
+        print(
+            f"{change.case:8} {change.metric:16} {change.old:12.6g} "
+            f"{change.new:12.6g} {change.ratio:6.2f}x {flag}"
+        )
+    regressions = sum(change.regressed for change in changes)
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def _scenario(args: argparse.Namespace) -> int:
+    results = {name: SCENARIOS[name](args.scale) for name in args.name}
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+def _parity(args: argparse.Namespace) -> int:
+    if not native.available():
+        print("cppjson library not built, run make in cppjson/", file=sys.stderr)
+        return 1
+    differences = parity(args.scale, args.seed)
+    for difference in differences:
+        print(difference)
+    print(f"{len(differences)} difference(s)")
+    return 1 if differences else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    runner = commands.add_parser("run", help="measure the corpus")
+    runner.add_argument("--scale", type=float, default=1.0)
+    runner.add_argument("--repeat", type=int, default=5)
+    runner.add_argument("--seed", type=int, default=0)
+    runner.add_argument("--case", action="append", choices=list(CASES))
+    runner.add_argument("--out", help="result file, stdout by default")
+    runner.set_defaults(handler=_run)
+    comparer = commands.add_parser("compare", help="flag regressions")
+    comparer.add_argument("old")
+    comparer.add_argument("new")
+    comparer.add_argument("--threshold", type=float, default=0.1)
+    comparer.set_defaults(handler=_compare)
+    scenario = commands.add_parser("scenario", help="compare a path with the one it replaced")
+    scenario.add_argument("name", nargs="+", choices=list(SCENARIOS))
+    scenario.add_argument("--scale", type=float, default=1.0)
+    scenario.set_defaults(handler=_scenario)
+    checker = commands.add_parser("parity", help="NativeLexer against FastLexer")
+    checker.add_argument("--scale", type=float, default=0.1)
+    checker.add_argument("--seed", type=int, default=0)
+    checker.set_defaults(handler=_parity)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
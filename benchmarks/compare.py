@@ -0,0 +1,46 @@
+"""
+Compares two result files written by the run command.
+A phase regressed when it got slower by more than the
+threshold, a fraction of the old time, likewise for peak
+memory. The stdlib phases are reported but never flagged,
+they only tell host noise apart from real changes.
+"""
+import typing as ty
+
+__all__ = "Change", "compare"
+
+
+class Change(ty.NamedTuple):
+    case: str
+    metric: str
+    old: float
+    new: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.new / self.old if self.old else float("inf")
+
+
+def _metrics(case: dict) -> dict[str, float]:
+    metrics = {f"{phase} s": value for phase, value in case["seconds"].items()}
+    metrics.update({f"{name} peak": value for name, value in case["peak"].items()})
+    return metrics
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> list[Change]:
+    """Every metric the two runs share, case by case."""
+    changes = []
+    for name, case in new["cases"].items():
+        if name not in old["cases"]:
+            continue
+        before = _metrics(old["cases"][name])
+        for metric, value in _metrics(case).items():
+            if metric not in before:
+                continue
+            regressed = (
+                not metric.startswith("json.")
+                and value > before[metric] * (1 + threshold)
+            )
+            changes.append(Change(name, metric, before[metric], value, regressed))
+    return changes
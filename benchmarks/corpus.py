@@ -0,0 +1,150 @@
+"""
+Synthetic corpus generator. Every case is a list of JSON
+documents written by the stdlib json module, so the corpus
+does not depend on the encoder under test. Generation is
+seeded, the same scale and seed always give the same text.
+"""
+import json
+import random
+import string
+import typing as ty
+
+__all__ = "Case", "CASES", "generate"
+
+
+class Case(ty.NamedTuple):
+    name: str
+    documents: list[str]
+
+    @property
+    def size(self) -> int:
+        return sum(len(document.encode()) for document in self.documents)
+
+
+_WORDS = ["alpha", "beta", "gamma", "delta", "épsilon", "zeta", "ηta", "θeta", "😀"]
+_ESCAPED = ['quo"te', "back\\slash", "tab\t", "new\nline", " ", "\x01"]
+
+
+def _word(chooser: random.Random) -> str:
+    return chooser.choice(_WORDS)
+
+
+def _text(chooser: random.Random, words: int) -> str:
+    parts = chooser.choices(_WORDS, k=words)
+    if chooser.random() < 0.1:
+        parts.append(chooser.choice(_ESCAPED))
+    return " ".join(parts)
+
+
+def _scalar(chooser: random.Random) -> ty.Any:
+    return chooser.choice(
+        [
+            chooser.randint(-(10**9), 10**9),
+            chooser.uniform(-1e6, 1e6),
+            _text(chooser, 2),
+            True,
+            False,
+            None,
+        ]
+    )
+
+
+def _record(chooser: random.Random, index: int) -> dict:
+    return {
+        "id": index,
+        "user": "".join(chooser.choices(string.ascii_lowercase, k=8)),
+        "event": chooser.choice(["click", "view", "purchase", "signup"]),
+        "ts": 1_700_000_000 + chooser.random() * 1e6,
+        "tags": chooser.choices(_WORDS, k=chooser.randint(0, 4)),
+        "ok": chooser.random() < 0.9,
+        "meta": {"ip": "10.0.0.1", "ref": None, "score": chooser.random()},
+    }
+
+
+def wide(chooser: random.Random, scale: float) -> list[str]:
+    """One object with thousands of keys."""
+    count = int(5000 * scale)
+    return [json.dumps({f"field_{i}": _scalar(chooser) for i in range(count)})]
+
+
+def deep(chooser: random.Random, scale: float) -> list[str]:
+    """Documents nested hundreds of levels deep."""
+    documents = []
+    for _ in range(max(int(20 * scale), 1)):
+        value: ty.Any = _scalar(chooser)
+        for level in range(300):
+            if level % 2:
+                value = [value, _scalar(chooser)]
+            else:
+                value = {"next": value, "level": level}
+        documents.append(json.dumps(value))
+    return documents
+
+
+def numeric(chooser: random.Random, scale: float) -> list[str]:
+    """Timeseries and embedding style arrays of numbers."""
+    count = max(int(20 * scale), 1)
+    return [
+        json.dumps(
+            {
+                "timestamps": [1_700_000_000 + i for i in range(1000)],
+                "values": [chooser.gauss(0, 1) for _ in range(1000)],
+                "embedding": [chooser.uniform(-1, 1) for _ in range(768)],
+            }
+        )
+        for _ in range(count)
+    ]
+
+
+def strings(chooser: random.Random, scale: float) -> list[str]:
+    """Records dominated by long text, escapes and non-ASCII."""
+    count = int(2000 * scale)
+    return [
+        json.dumps(
+            [
+                {
+                    "title": _text(chooser, 6),
+                    "body": _text(chooser, chooser.randint(20, 80)),
+                    "author": _word(chooser),
+                }
+                for _ in range(count)
+            ],
+            ensure_ascii=False,
+        )
+    ]
+
+
+def small(chooser: random.Random, scale: float) -> list[str]:
+    """Thousands of ~100 byte messages, decoded one by one."""
+    count = int(3000 * scale)
+    return [
+        json.dumps(
+            {"id": i, "op": chooser.choice(["get", "set"]), "key": _word(chooser)}
+        )
+        for i in range(count)
+    ]
+
+
+def ndjson(chooser: random.Random, scale: float) -> list[str]:
+    """Log style records, one JSON Lines line per document."""
+    count = int(3000 * scale)
+    return [json.dumps(_record(chooser, i)) for i in range(count)]
+
+
+CASES: dict[str, ty.Callable[[random.Random, float], list[str]]] = {
+    "wide": wide,
+    "deep": deep,
+    "numeric": numeric,
+    "strings": strings,
+    "small": small,
+    "ndjson": ndjson,
+}
+
+
+def generate(
+    scale: float = 1.0, seed: int = 0, names: ty.Iterable[str] | None = None
+) -> list[Case]:
+    return [
+        Case(name, CASES[name](random.Random(f"{seed}:{name}"), scale))
+        for name in (CASES if names is None else names)
+    ]
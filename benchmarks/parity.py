@@ -0,0 +1,69 @@
+"""
+NativeLexer against FastLexer over the corpus, every
+document as generated and again with junk spliced in,
+plus the malformed inputs the C++ lexer hands back to
+FastLexer:
+
+    python -m benchmarks parity --scale 0.1
+
+Any difference in tokens, offsets or errors is listed
+and the command exits with status 1.
+"""
+from pyjson.native import compare
+from .corpus import generate
+import random
+
+__all__ = ("parity",)
+
+# Bad keywords, \v and \f, stray quotes, leading newlines
+_MALFORMED = [
+    "",
+    "\n",
+    "\n\n[1]",
+    "\n  {\n}",
+    "[tru]",
+    "[nul]",
+    "[falsey]",
+    "[True]",
+    '{"a"\v: 1}',
+    "[1,\f2]",
+    "\v\f[\v]\f",
+    '["open]',
+    '["a""]',
+    '"',
+    '{"a": "b}',
+    '["\\x"]',
+    '["\\u12"]',
+    '["tab\t"]',
+    "[1.]",
+    "[-]",
+    "[1e]",
+    "[1.5e+]",
+    "[01]",
+    "[--1]",
+    "[1]@",
+    "[1]\x00",
+]
+_JUNK = ["tru", "nul", "fals", "\v", "\f", '"', "\n", "\\", "-", ".", "e", "@", "\x00"]
+
+
+def _spliced(chooser: random.Random, document: str) -> str:
+    for _ in range(chooser.randint(1, 3)):
+        position = chooser.randrange(len(document) + 1)
+        document = document[:position] + chooser.choice(_JUNK) + document[position:]
+    return document
+
+
+def parity(scale: float = 1.0, seed: int = 0) -> list[str]:
+    """Every difference found, one line per input."""
+    chooser = random.Random(seed)
+    sources = [("malformed", source) for source in _MALFORMED]
+    for case in generate(scale, seed):
+        for document in case.documents:
+            sources.append((case.name, document))
+            sources.append((f"{case.name} spliced", _spliced(chooser, document)))
+    differences = []
+    for index, (name, source) in enumerate(sources):
+        if (difference := compare(source)) is not None:
+            differences.append(f"{name} #{index}: {difference}")
+    return differences
@@ -0,0 +1,132 @@
+"""
+Times every phase of the pipeline over each corpus case,
+next to the stdlib json module, and measures peak memory
+with tracemalloc. Each phase runs over all documents of
+a case with its input prepared beforehand, the best of
+repeat rounds is kept, the least disturbed by the host.
+"""
+from pyjson.composer import Composer
+from pyjson.parser import Parser
+from pyjson.lexer import FastLexer
+from .corpus import Case, generate
+import subprocess
+import tracemalloc
+import platform
+import datetime
+import pyjson
+import typing as ty
+import time
+import json
+import gc
+
+__all__ = "PHASES", "measure", "run"
+
+# Phase name -> (prepare the input of a document, the timed step)
+PHASES: dict[str, tuple[ty.Callable, ty.Callable]] = {
+    "lex": (lambda document: document, lambda source: FastLexer(source).compact()),
+    "parse": (
+        lambda document: FastLexer(document).compact(),
+        lambda tokens: Parser(tokens).parse(),
+    ),
+    "compose": (
+        lambda document: pyjson.parse(document),
+        lambda ast: Composer().compose(ast),
+    ),
+    "encode": (pyjson.loads, pyjson.dumps),
+    "loads": (lambda document: document, pyjson.loads),
+    "json.loads": (lambda document: document, json.loads),
+    "json.dumps": (json.loads, lambda value: json.dumps(value, ensure_ascii=False)),
+}
+
+
+def _best(step: ty.Callable, inputs: list, repeat: int) -> float:
+    """Fewest seconds step took over all inputs in a round."""
+    clock = time.perf_counter
+    best = float("inf")
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = clock()
+            for item in inputs:
+                step(item)
+            best = min(best, clock() - start)
+            gc.collect()
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def _peak(decode: ty.Callable, documents: list[str]) -> int:
+    """Peak bytes traced while decoding and keeping every document."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        values = [decode(document) for document in documents]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del values
+    return peak
+
+
+def measure(case: Case, repeat: int = 5) -> dict:
+    seconds = {
+        phase: _best(step, [prepare(document) for document in case.documents], repeat)
+        for phase, (prepare, step) in PHASES.items()
+    }
+    return {
+        "documents": len(case.documents),
+        "bytes": case.size,
+        "seconds": seconds,
+        "peak": {
+            "loads": _peak(pyjson.loads, case.documents),
+            "json.loads": _peak(json.loads, case.documents),
+        },
+    }
+
+
+def _revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def run(
+    scale: float = 1.0,
+    repeat: int = 5,
+    seed: int = 0,
+    names: ty.Iterable[str] | None = None,
+    report: ty.Callable[[str, dict], None] | None = None,
+) -> dict:
+    """
+    Results for every case as plain data, ready for
+    json.dump. report, when given, sees each case as
+    soon as it is measured.
+    """
+    cases = {}
+    for case in generate(scale, seed, names):
+        cases[case.name] = measure(case, repeat)
+        if report is not None:
+            report(case.name, cases[case.name])
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "revision": _revision(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "cases": cases,
+    }
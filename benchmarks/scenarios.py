@@ -0,0 +1,442 @@
+"""
+Measurements the corpus phases can not make, each one
+comparing a code path with the one it replaced. A
+scenario takes the scale and returns plain data:
+
+    python -m benchmarks scenario load --scale 10
+
+Those measuring peak RSS run every variant in a fresh
+interpreter, the high-water mark of a process never
+goes down.
+"""
+from pyjson.aio import aload, aiterparse, adump
+from pyjson.batch import loads_many, load_lines
+from pyjson.objects import Object, Array
+from pyjson.exc import JsonDecoderError
+from pyjson.decoder import Decoder
+from pyjson.pool import CodecPool
+from concurrent.futures import ThreadPoolExecutor
+from .corpus import CASES
+import subprocess
+import functools
+import tracemalloc
+import tempfile
+import asyncio
+import threading
+import socket
+import random
+import typing as ty
+import pyjson
+import json
+import time
+import sys
+import gc
+import os
+
+__all__ = ("SCENARIOS",)
+
+# Prints, as JSON, the seconds to the first token, the
+# seconds to the decoded value and the peak RSS in KiB
+_LOAD = """
+import resource, sys, time, json, pyjson
+from pathlib import Path
+from pyjson.lexer import FastLexer, BytesLexer
+path, variant = sys.argv[1:]
+clock = time.perf_counter
+start = clock()
+if variant == "mmap":
+    import mmap
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        next(BytesLexer(buffer).stream())
+        first = clock() - start
+    start = clock()
+    value = pyjson.load(path)
+else:
+    next(FastLexer(Path(path).read_text()).stream())
+    first = clock() - start
+    start = clock()
+    value = pyjson.loads(Path(path).read_text())
+total = clock() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"first token s": first, "load s": total, "peak rss KiB": peak}))
+"""
+
+
+def _child(code: str, *args: str) -> dict:
+    environment = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [root, environment.get("PYTHONPATH")])
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+    )
+    return json.loads(completed.stdout)
+
+
+def load(scale: float) -> dict:
+    """
+    load of a memory mapped file against decoding the
+    text read_text returns, what load did before: time
+    to the first token, to the value and peak RSS.
+    """
+    chooser = random.Random("load")
+    records = CASES["ndjson"](chooser, 10 * scale)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "load.json")
+        with open(path, "w") as file:
+            file.write("[" + ",\n".join(records) + "]")
+        results = {"bytes": os.path.getsize(path)}
+        for variant in "mmap", "read_text":
+            results[variant] = _child(_LOAD, path, variant)
+    return results
+
+
+def _seconds(step: ty.Callable[[], ty.Any]) -> float:
+    start = time.perf_counter()
+    step()
+    return time.perf_counter() - start
+
+
+def batch(scale: float) -> dict:
+    """
+    loads_many and load_lines over JSON Lines records,
+    from one worker up to one per core, against a plain
+    loop over loads in this process.
+    """
+    chooser = random.Random("batch")
+    records = CASES["ndjson"](chooser, 13 * scale)
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, cores} | {n for n in (4, 8, 16) if n < cores})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "batch.jsonl")
+        with open(path, "w") as file:
+            file.write("\n".join(records))
+        seconds = {"loop": _seconds(lambda: [pyjson.loads(r) for r in records])}
+        for workers in counts:
+            seconds[f"loads_many workers={workers}"] = _seconds(
+                lambda: list(loads_many(records, workers=workers))
+            )
+            seconds[f"load_lines workers={workers}"] = _seconds(
+                lambda: list(load_lines(path, workers=workers))
+            )
+    return {"records": len(records), "cores": cores, "seconds": seconds}
+
+
+def _per_call(step: ty.Callable[[], ty.Any], calls: int, repeat: int = 7) -> float:
+    """Fewest seconds per call over repeat rounds of calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            step()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def decoder(scale: float) -> dict:
+    """
+    Decoder.decode against loads on one message of 101
+    bytes, as text, as bytes and malformed, the last
+    taking the loads path in both. json.loads for scale.
+    """
+    message = (
+        '{"id": 12345, "op": "set", "key": "user:42", '
+        '"value": [1, 2.5, true, null], "ok": false, "ttl": 3600}'
+    )
+    inputs = {"str": message, "bytes": message.encode(), "malformed": message[:-1]}
+    calls = max(int(5000 * scale), 1)
+    bound = Decoder()
+
+    def attempt(decode: ty.Callable, source: str | bytes) -> ty.Callable[[], None]:
+        def step() -> None:
+            try:
+                decode(source)
+            except JsonDecoderError:
+                pass
+
+        return step
+
+    seconds = {}
+    for name, source in inputs.items():
+        seconds[f"{name} loads"] = _per_call(attempt(pyjson.loads, source), calls)
+        seconds[f"{name} Decoder"] = _per_call(attempt(bound.decode, source), calls)
+    seconds["str json.loads"] = _per_call(lambda: json.loads(message), calls)
+    return {"bytes": len(message), "calls": calls, "seconds per call": seconds}
+
+
+def _peak(step: ty.Callable[[], ty.Any]) -> int:
+    """Most bytes allocated at once while step runs."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        step()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def inputs(scale: float, repeat: int = 5) -> dict:
+    """
+    loads throughput and peak memory on one UTF-8 record
+    corpus given as str, bytes, bytearray, memoryview,
+    UTF-8 with a BOM, UTF-16 and UTF-32, next to bytes
+    decoded to str first, what callers did before.
+    """
+    chooser = random.Random("inputs")
+    records = CASES["ndjson"](chooser, scale)
+    text = json.dumps(json.loads("[" + ",".join(records) + "]"), ensure_ascii=False)
+    data = text.encode()
+    sources = {
+        "str": text,
+        "bytes": data,
+        "bytearray": bytearray(data),
+        "memoryview": memoryview(data),
+        "UTF-8 with BOM": "\ufeff".encode() + data,
+        "UTF-16": text.encode("utf-16"),
+        "UTF-32": text.encode("utf-32"),
+    }
+    variants: dict[str, ty.Callable[[], ty.Any]] = {
+        "bytes, decoded first": lambda: pyjson.loads(data.decode()),
+    }
+    for name, source in sources.items():
+        variants[name] = functools.partial(pyjson.loads, source)
+    best = dict.fromkeys(variants, float("inf"))
+    for _ in range(repeat):  # Interleaved, a noisy spell hits every variant
+        for name, step in variants.items():
+            best[name] = min(best[name], _seconds(step))
+    megabytes = len(data) / 1e6
+    return {
+        "utf-8 bytes": len(data),
+        "MB/s": {name: megabytes / seconds for name, seconds in best.items()},
+        "peak MB": {name: _peak(step) / 1e6 for name, step in variants.items()},
+    }
+
+
+def _nodes(root: ty.Any) -> int:
+    """Values in an AST, mapping keys excluded."""
+    count, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if type(node) is Object:
+            stack.extend(value for _, value in node.value)
+        elif type(node) is Array:
+            stack.extend(node.value)
+    return count
+
+
+def _retained(build: ty.Callable[[], ty.Any]) -> tuple[ty.Any, int]:
+    """What build returns and the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, retained
+
+
+def ast(scale: float) -> dict:
+    """
+    Bytes the parse() AST of one large document holds
+    per node, the tokens of its leaves included, next to
+    the values of json.loads.
+    """
+    chooser = random.Random("ast")
+    document = "[" + ",".join(CASES["ndjson"](chooser, 6.7 * scale)) + "]"
+    tree, retained = _retained(lambda: pyjson.parse(document))
+    nodes = _nodes(tree)
+    del tree
+    _, stdlib = _retained(lambda: json.loads(document))
+    return {
+        "nodes": nodes,
+        "parse bytes per node": retained / nodes,
+        "json.loads bytes per node": stdlib / nodes,
+    }
+
+
+async def _stalls(work: ty.Callable[[], ty.Awaitable]) -> dict:
+    """
+    Run work with two probes on the loop: a callback
+    rescheduling itself with call_soon sees the longest
+    single loop iteration, a task sleeping 1 ms how late
+    a timer wakes up.
+    """
+    loop = asyncio.get_running_loop()
+    clock = time.perf_counter
+    blocked = late = 0.0
+    done = False
+
+    def probe(last: float) -> None:
+        nonlocal blocked
+        now = clock()
+        blocked = max(blocked, now - last)
+        if not done:
+            loop.call_soon(probe, now)
+
+    async def sleeper() -> None:
+        nonlocal late
+        while not done:
+            start = clock()
+            await asyncio.sleep(0.001)
+            late = max(late, clock() - start - 0.001)
+
+    loop.call_soon(probe, clock())
+    sleeping = asyncio.create_task(sleeper())
+    await asyncio.sleep(0)  # The sleeper is asleep before work starts
+    start = clock()
+    await work()
+    total = clock() - start
+    done = True
+    await sleeping
+    return {"total s": total, "blocked s": blocked, "timer late s": late}
+
+
+async def _written(encode: ty.Callable[[asyncio.StreamWriter], ty.Awaitable]) -> int:
+    """Bytes encode writes to a socket, read to the end by another task."""
+    near, far = socket.socketpair()
+    reader, far_writer = await asyncio.open_connection(sock=far)
+    near_reader, writer = await asyncio.open_connection(sock=near)
+
+    async def drain() -> int:
+        received = 0
+        while data := await reader.read(1 << 16):
+            received += len(data)
+        return received
+
+    drained = asyncio.create_task(drain())
+    try:
+        await encode(writer)
+        writer.write_eof()
+        return await drained
+    finally:
+        for stream in writer, far_writer:
+            stream.close()
+            await stream.wait_closed()
+
+
+async def _aio(body: bytes, chunk_size: int) -> dict:
+    value = pyjson.loads(body)
+
+    def reader() -> asyncio.StreamReader:
+        stream = asyncio.StreamReader()
+        stream.feed_data(body)
+        stream.feed_eof()
+        return stream
+
+    async def chunks() -> ty.AsyncIterator[bytes]:
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    async def loads() -> None:
+        pyjson.loads(body)
+
+    async def events() -> None:
+        async for _ in aiterparse(reader()):
+            pass
+
+    async def dumps(writer: asyncio.StreamWriter) -> None:
+        writer.write(pyjson.dumps(value).encode())
+        await writer.drain()
+
+    async def dump(writer: asyncio.StreamWriter) -> None:
+        await adump(value, writer)
+
+    variants: dict[str, ty.Callable[[], ty.Awaitable]] = {
+        "loads in a coroutine": loads,
+        "aload StreamReader": lambda: aload(reader()),
+        "aload async iterator": lambda: aload(chunks()),
+        "aiterparse": events,
+        "dumps + write": lambda: _written(dumps),
+        "adump": lambda: _written(dump),
+    }
+    return {name: await _stalls(work) for name, work in variants.items()}
+
+
+def aio(scale: float) -> dict:
+    """
+    How long the event loop is held up decoding and
+    encoding one body, with loads and dumps in a
+    coroutine against aload, aiterparse and adump.
+    """
+    chooser = random.Random("aio")
+    body = ("[" + ",".join(CASES["ndjson"](chooser, 0.8 * scale)) + "]").encode()
+    return {"bytes": len(body), **asyncio.run(_aio(body, 1 << 16))}
+
+
+def _shared(codecs: CodecPool, records: list[str], threads: int) -> None:
+    """
+    Round-trip the records on every thread at once and
+    check each thread got its own codecs and the same
+    results as the calling thread.
+    """
+    expected = [codecs.loads(record) for record in records]
+    barrier = threading.Barrier(threads)
+
+    def work(offset: int) -> tuple[int, int]:
+        barrier.wait()
+        for step in range(len(records)):
+            index = (offset + step) % len(records)
+            value = codecs.loads(records[index])
+            if value != expected[index] or codecs.loads(codecs.dumps(value)) != value:
+                raise AssertionError(f"Thread {offset} corrupted record {index}")
+        return id(codecs.decoder()), id(codecs.encoder())
+
+    with ThreadPoolExecutor(threads) as executor:
+        instances = list(executor.map(work, range(threads)))
+    if len(set(instances)) != threads:
+        raise AssertionError("Threads shared codec instances")
+
+
+def _round_trips(codecs: CodecPool, records: list[str], threads: int) -> float:
+    """Records round-tripped per second across threads."""
+
+    def work(_: int) -> None:
+        for record in records:
+            codecs.dumps(codecs.loads(record))
+
+    with ThreadPoolExecutor(threads) as executor:
+        return threads * len(records) / _seconds(
+            lambda: list(executor.map(work, range(threads)))
+        )
+
+
+def pool(scale: float) -> dict:
+    """
+    CodecPool round trips per second from one thread to
+    eight, after checking every thread gets codecs of
+    its own and the results of a single thread.
+    """
+    chooser = random.Random("pool")
+    records = CASES["ndjson"](chooser, 0.67 * scale)
+    counts = 1, 2, 4, 8
+    for codecs in CodecPool(), CodecPool(intern_keys=True), CodecPool(indent="  "):
+        for threads in counts:
+            _shared(codecs, records, threads)
+    codecs = CodecPool()
+    return {
+        "records": len(records),
+        "gil": getattr(sys, "_is_gil_enabled", lambda: True)(),
+        "records per second": {
+            f"threads={threads}": _round_trips(codecs, records, threads)
+            for threads in counts
+        },
+    }
+
+
+SCENARIOS: dict[str, ty.Callable[[float], dict]] = {
+    "load": load,
+    "batch": batch,
+    "decoder": decoder,
+    "ast": ast,
+    "aio": aio,
+    "pool": pool,
+    "inputs": inputs,
+}
@@ -0,0 +1,46 @@
+// C interface to Json::Lexer for pyjson's ctypes backend.
+// Build with `make` in this directory, see Makefile.
+#include "json.cpp"
+#include <cstdint>
+#include <cstddef>
+
+namespace {
+  struct Handle {
+    Json::Lexer lexer;
+    const char* base;
+    bool done;
+  };
+}
+
+extern "C" {
+  void* cppjson_lexer_new(const char* source, std::size_t length) {
+    return new Handle{ Json::Lexer({ source, length }), source, false };
+  }
+
+  void cppjson_lexer_free(void* handle) {
+    delete static_cast<Handle*>(handle);
+  }
+
+  // Fill up to capacity tokens into the parallel arrays and return how many
+  // were written. Stops after an Eot or Error token, later calls return 0.
+  std::size_t cppjson_lexer_next(
+    void* handle, std::size_t capacity, std::uint8_t* kinds,
+    std::uint64_t* starts, std::uint64_t* ends,
+    std::uint32_t* lines, std::uint32_t* columns
+  ) {
+    using enum Json::Token::Kind;
+    auto* self = static_cast<Handle*>(handle);
+    std::size_t count = 0;
+    while ( not self->done and count < capacity ) {
+      Json::Token tk = self->lexer.get();
+      kinds[count] = static_cast<std::uint8_t>(tk.kind);
+      starts[count] = tk.content.data() - self->base;
+      ends[count] = starts[count] + tk.content.size();
+      lines[count] = tk.location.line;
+      columns[count] = tk.location.column;
+      self->done = tk.kind == Eot or tk.kind == Error;
+      count++;
+    }
+    return count;
+  }
+}
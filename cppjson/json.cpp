@@ -41,6 +41,8 @@ namespace Json {
 
   void Lexer::feed(std::string_view source) {
     head = start = (src = source).begin();
+    // advance only sees newlines it moves onto, not a leading one
+    if ( not src.empty() and src.front() == '\n' ) line++;
   }
 
   void Lexer::advance() {
@@ -67,7 +69,7 @@ namespace Json {
 
   bool Lexer::space() {
     while ( not empty() )
-      if ( not(match('\t') or match('\n') or match(' ')) )
+      if ( not(match('\t') or match('\n') or match(' ') or match('\v') or match('\f')) )
         break;
     // Discard all gathered spaces and return if it is now empty
     return (consume(), empty());
@@ -78,23 +80,61 @@ namespace Json {
     return (advance(), consume_token(kind));
   }
 
+  bool Lexer::escape() {
+    advance(); // Consume the backslash
+    if ( empty() ) return false;
+    if ( match('u') ) {
+      for ( int i = 0; i < 4; i++ )
+        if ( empty() or not std::isxdigit(peek()) ) return false;
+        else advance();
+      return true;
+    }
+    return peek() != '\0' and std::string_view("\"\\/bfnrt").contains(peek()) ?
+      (advance(), true) : false;
+  }
+
   Token Lexer::string() {
     advance(); // Consume Openning quote
-    while ( not empty() and peek() != '"' )
+    while ( not empty() and peek() != '"' ) {
+      if ( peek() == '\\' ) {
+        if ( not escape() ) return make_etoken("Invalid escape sequence.");
+        continue;
+      }
       if ( (advance(), peek(-1) == '\n') )
         return make_etoken(
           "Multiline strings are not supported. "
           "String Unterminated."
         );
+    }
     return empty() ?
       make_etoken("Unterminated string.") :
       // Consume the Closing Quote and create a string token
       make_ctoken(Token::Kind::String);
   }
 
-  Token Lexer::number() {
+  bool Lexer::digits() {
+    if ( empty() or not std::isdigit(peek()) ) return false;
     while ( not empty() and std::isdigit(peek()) ) advance();
-    return make_token(Token::Kind::Number);
+    return true;
+  }
+
+  Token Lexer::number() {
+    // -?(0|[1-9][0-9]*)(.[0-9]+)?([eE][+-]?[0-9]+)?
+    using enum Token::Kind;
+    Token::Kind kind = Number;
+    match('-');
+    if ( not(match('0') or digits()) )
+      return make_etoken("Expected a digit after the minus sign.");
+    if ( match('.') ) {
+      if ( not digits() ) return make_etoken("Expected a digit after the decimal point.");
+      kind = Float;
+    }
+    if ( match('e') or match('E') ) {
+      match('+') or match('-');
+      if ( not digits() ) return make_etoken("Expected a digit in the exponent.");
+      kind = Float;
+    }
+    return make_token(kind);
   }
 
   Token Lexer::identifier() {
@@ -121,6 +161,7 @@ namespace Json {
       case ']': return make_ctoken(CloseBracket);
       case ':': return make_ctoken(Colon);
       case ',': return make_ctoken(Comma);
+      case '-': return number();
       case '"': return string();
       default:
         if ( std::isdigit(peek()) ) return number();
@@ -48,6 +48,8 @@ namespace Json {
     char peek(int offset = 0);
     std::size_t length();
     Token identifier();
+    bool digits();
+    bool escape();
     void advance();
     void consume();
     Token string();
@@ -2,5 +2,39 @@
 My implementation of a json parser
 Have Fun (*_*)
 """
-__all__ = "load", "loads", "dumps", "dump"
-from .json import load, loads, dumps, dump
+__all__ = (
+    "load",
+    "loads",
+    "dumps",
+    "dump",
+    "iterencode",
+    "parse",
+    "documents",
+    "iterparse",
+    "select",
+    "IncrementalDecoder",
+    "loads_many",
+    "load_lines",
+    "Decoder",
+    "aload",
+    "aiterparse",
+    "adump",
+    "Stats",
+    "add_hook",
+    "remove_hook",
+    "EditableDocument",
+    "Schema",
+    "loads_as",
+    "CodecPool",
+)
+from .json import load, loads, dumps, dump, iterencode, parse, documents
+from .incremental import IncrementalDecoder
+from .events import iterparse
+from .query import select
+from .batch import loads_many, load_lines
+from .decoder import Decoder
+from .aio import aload, aiterparse, adump
+from .stats import Stats, add_hook, remove_hook
+from .edits import EditableDocument
+from .schema import Schema, loads_as
+from .pool import CodecPool
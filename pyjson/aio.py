@@ -0,0 +1,96 @@
+from .incremental import IncrementalDecoder, IncrementalLexer
+from .events import EventParser, Event
+from .encoder import Encoder
+from .core import BaseTypes
+import typing as ty
+import asyncio
+import time
+
+__all__ = "aload", "aiterparse", "adump"
+
+Source = asyncio.StreamReader | ty.AsyncIterable[str | bytes]
+# Characters decoded between two looks at the clock
+_PIECE = 1 << 10
+
+
+async def _chunks(source: Source, chunk_size: int) -> ty.AsyncIterator[str | bytes]:
+    if hasattr(source, "read"):
+        while chunk := await source.read(chunk_size):  # type: ignore[union-attr]
+            yield chunk
+    else:
+        async for chunk in source:
+            yield chunk
+
+
+async def _pieces(
+    source: Source, chunk_size: int, interval: float
+) -> ty.AsyncIterator[str | bytes]:
+    """
+    The chunks of source cut into small pieces, handing
+    control back to the loop once the consumer has had
+    interval seconds since the last time. A buffered
+    chunk is read without the loop getting a turn.
+    """
+    clock = time.perf_counter
+    last = clock()
+    async for chunk in _chunks(source, chunk_size):
+        for start in range(0, len(chunk), _PIECE):
+            yield chunk[start : start + _PIECE]
+            if clock() - last >= interval:
+                await asyncio.sleep(0)
+                last = clock()
+
+
+async def aload(
+    source: Source, *, chunk_size: int = 1 << 16, interval: float = 0.005
+) -> BaseTypes:
+    """
+    Decode the document read from source, a StreamReader
+    or an async iterable of str or bytes chunks, as it
+    arrives. The event loop gets control back about every
+    interval seconds, bounding how long other tasks wait.
+    """
+    decoder = IncrementalDecoder()
+    async for piece in _pieces(source, chunk_size, interval):
+        decoder.feed(piece)
+    return decoder.close()
+
+
+async def aiterparse(
+    source: Source, *, chunk_size: int = 1 << 16, interval: float = 0.005
+) -> ty.AsyncIterator[Event]:
+    """
+    iterparse for a StreamReader or an async iterable of
+    chunks, events are yielded as soon as their piece of
+    input is decoded, see aload. Time the consumer spends
+    on them counts towards the interval.
+    """
+    lexer, parser = IncrementalLexer(), EventParser()
+    async for piece in _pieces(source, chunk_size, interval):
+        parser.push(lexer.feed(piece))
+        for event in parser.events:
+            yield event
+        parser.events.clear()
+    parser.push(lexer.close())
+    for event in parser.events:
+        yield event
+
+
+async def adump(
+    obj,
+    writer: asyncio.StreamWriter,
+    *,
+    indent: str | None = None,
+    chunk_size: int = 1 << 13,
+) -> None:
+    """
+    Write obj to writer as UTF-8, chunk_size characters
+    at a time, draining after every chunk so a slow
+    reader holds the encoder back instead of the buffer
+    growing. drain only waits past the high-water mark,
+    the loop gets control back after every chunk anyway.
+    """
+    for chunk in Encoder(indent).iterencode(obj, chunk_size):
+        writer.write(chunk.encode())
+        await writer.drain()
+        await asyncio.sleep(0)
@@ -0,0 +1,150 @@
+from .exc import JsonDecoderError, RecordError
+from concurrent.futures import Future, ProcessPoolExecutor
+from .parser import DirectParser
+from .core import BaseTypes
+from .decoder import Decoder
+from .json import _lexer
+from pathlib import Path
+import collections
+import itertools
+import typing as ty
+import os
+
+__all__ = "loads_many", "load_lines"
+
+T = ty.TypeVar("T")
+Errors = ty.Literal["raise", "return"]
+_decoder = Decoder()
+
+
+class _Failure(ty.NamedTuple):
+    # A record that did not decode, as it comes back from a worker
+    error: JsonDecoderError
+    line: int | None = None
+
+
+Outcome = BaseTypes | _Failure
+
+
+def _decode_record(record: str | bytes) -> BaseTypes:
+    """A record as documents() sees it, scalar roots included."""
+    if record.lstrip()[:1] in ("{", "[", b"{", b"["):
+        return _decoder.decode(record)
+    value = DirectParser(_lexer(record, None).stream()).parse_value()
+    if isinstance(value, Exception):
+        raise value.result
+    return value.result
+
+
+def _decode_records(records: list[str | bytes]) -> list[Outcome]:
+    outcomes: list[Outcome] = []
+    for record in records:
+        try:
+            outcomes.append(_decode_record(record))
+        except JsonDecoderError as e:
+            outcomes.append(_Failure(e))
+    return outcomes
+
+
+def _decode_block(task: tuple[int, bytes]) -> list[Outcome]:
+    """The records of a block starting on line first, blank lines skipped."""
+    first, block = task
+    outcomes: list[Outcome] = []
+    for line, record in enumerate(block.split(b"\n"), first):
+        record = record.rstrip(b"\r")
+        if not record.strip():
+            continue
+        try:
+            outcomes.append(_decode_record(record))
+        except JsonDecoderError as e:
+            outcomes.append(_Failure(e, line))
+    return outcomes
+
+
+def _outcomes(
+    tasks: ty.Iterable[T],
+    decode: ty.Callable[[T], list[Outcome]],
+    workers: int | None,
+) -> ty.Iterator[Outcome]:
+    """
+    Run decode over tasks in a process pool, yielding
+    the outcomes in task order. At most two tasks per
+    worker are in flight, tasks are drawn lazily.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield from decode(task)
+        return
+    pending: collections.deque[Future] = collections.deque()
+    with ProcessPoolExecutor(workers) as executor:
+        for task in tasks:
+            pending.append(executor.submit(decode, task))
+            if len(pending) > 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _indexed(outcomes: ty.Iterable[Outcome], errors: Errors) -> ty.Iterator[ty.Any]:
+    for index, outcome in enumerate(outcomes):
+        if type(outcome) is _Failure:
+            outcome = RecordError(index, outcome.error, outcome.line)
+            if errors == "raise":
+                raise outcome
+        yield outcome
+
+
+def loads_many(
+    sources: ty.Iterable[str | bytes],
+    *,
+    workers: int | None = None,
+    chunk_size: int = 1024,
+    errors: Errors = "raise",
+) -> ty.Iterator[BaseTypes | RecordError]:
+    """
+    Decode every document of sources, chunk_size at a
+    time on workers processes (all cores by default),
+    yielding the values in input order. Roots may be
+    scalars, as in JSON Lines. A failing document raises
+    RecordError carrying its index, or with
+    errors="return" is yielded in place as one.
+    """
+    documents = iter(sources)
+    chunks = iter(lambda: list(itertools.islice(documents, chunk_size)), [])
+    return _indexed(_outcomes(chunks, _decode_records, workers), errors)
+
+
+def _blocks(path: Path, block_size: int) -> ty.Iterator[tuple[int, bytes]]:
+    """Blocks of whole lines, each with the number of its first line."""
+    with path.open("rb") as file:
+        rest, line = b"", 1
+        while block := file.read(block_size):
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            rest = block[cut:]
+            if cut:
+                yield line, block[:cut]
+                line += block.count(b"\n", 0, cut)
+        if rest:
+            yield line, rest
+
+
+def load_lines(
+    filepath: Path | str,
+    *,
+    workers: int | None = None,
+    block_size: int = 1 << 20,
+    errors: Errors = "raise",
+) -> ty.Iterator[BaseTypes | RecordError]:
+    """
+    Decode a JSON Lines file, one document per line,
+    blank lines skipped. The file is cut into blocks of
+    about block_size bytes on line boundaries and the
+    workers split and decode the blocks themselves,
+    otherwise as loads_many. index counts records, blank
+    lines aside, the line of a RecordError is its line
+    in the file, counting from 1.
+    """
+    blocks = _blocks(Path(str(filepath)), block_size)
+    return _indexed(_outcomes(blocks, _decode_block, workers), errors)
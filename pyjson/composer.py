@@ -1,18 +1,149 @@
 from .core import Visitor, Value
+from .objects import Array, Object
+from .token import TokenType
+import collections
 import typing as ty
 
 if ty.TYPE_CHECKING:
-    from .objects import Array, Object, String, Boolean, Null, Number
+    from .objects import String, Boolean, Null, Number
 else:
-    Object = Array = String = Boolean = Number = Null = None
+    String = Boolean = Number = Null = None
+
+
+class KeyCache:
+    """
+    Bounded LRU caches of mapping keys and of shapes,
+    the key sequences of whole mappings. Keys repeated
+    across records come out as one shared str, every
+    record of a shape shares one tuple of them.
+    """
+
+    def __init__(self, size: int = 4096) -> None:
+        self._keys: collections.OrderedDict[str, str] = collections.OrderedDict()
+        self._shapes: collections.OrderedDict[tuple, tuple] = collections.OrderedDict()
+        self.size = size
+
+    def key(self, key: str) -> str:
+        keys = self._keys
+        if (cached := keys.get(key)) is not None:
+            keys.move_to_end(key)
+            return cached
+        keys[key] = key
+        if len(keys) > self.size:
+            keys.popitem(last=False)
+        return key
+
+    def shape(self, keys: tuple[str, ...]) -> tuple[str, ...]:
+        shapes = self._shapes
+        if (cached := shapes.get(keys)) is not None:
+            shapes.move_to_end(keys)
+            return cached
+        shape = tuple(map(self.key, keys))
+        shapes[shape] = shape
+        if len(shapes) > self.size:
+            shapes.popitem(last=False)
+        return shape
 
 
 class Composer(Visitor):
+    """
+    Turns the AST into Python objects. With a KeyCache
+    mapping keys are interned and every mapping starts
+    out as dict.fromkeys of its cached shape, so records
+    sharing a key set share their key strings.
+    """
+
+    def __init__(self, keys: KeyCache | None = None) -> None:
+        self.keys = keys
+
     def visit_array(self, array: Array):
-        return [value.accept(self) for value in array.value]
+        return self._compose_container(array)
 
     def visit_object(self, object: Object):
-        return {key.accept(self): value.accept(self) for key, value in object.value}
+        return self._compose_container(object)
+
+    def _compose_container(self, root: Array | Object):
+        """
+        Nested containers are tracked on an explicit stack
+        rather than by recursing through accept, each one is
+        attached to its parent as soon as it is opened.
+        """
+        if self.keys is not None:
+            return self._compose_keyed(root)
+        result = [] if type(root) is Array else {}
+        stack = [(iter(root.value), result)]
+        while stack:
+            values, container = stack[-1]
+            if type(container) is list:
+                for node in values:
+                    if type(node) is Array or type(node) is Object:
+                        child = [] if type(node) is Array else {}
+                        container.append(child)
+                        stack.append((iter(node.value), child))
+                        break
+                    container.append(node.accept(self))
+                else:
+                    stack.pop()
+            else:
+                for key, node in values:
+                    if type(node) is Array or type(node) is Object:
+                        child = [] if type(node) is Array else {}
+                        container[key.accept(self)] = child
+                        stack.append((iter(node.value), child))
+                        break
+                    container[key.accept(self)] = node.accept(self)
+                else:
+                    stack.pop()
+        return result
+
+    def _compose_keyed(self, root: Array | Object):
+        """
+        _compose_container with the keys taken from the
+        cached shape of each mapping, which starts out as
+        dict.fromkeys of it. Assigning to a key already
+        placed keeps the shared key object.
+        """
+        cache = self.keys
+        # Frames are [members, container, pending mapping key], mapping
+        # members are (key, (key node, value node)) with key out of the shape
+        stack: list[list] = []
+        node = root
+        while True:
+            if node is not None:
+                if type(node) is Array:
+                    child, members = [], iter(node.value)
+                else:
+                    shape = cache.shape(tuple([key.value for key, _ in node.value]))
+                    child, members = dict.fromkeys(shape), zip(shape, node.value)
+                if stack:
+                    parent = stack[-1]
+                    if type(parent[1]) is list:
+                        parent[1].append(child)
+                    else:
+                        parent[1][parent[2]] = child
+                stack.append([members, child, None])
+                node = None
+            frame = stack[-1]
+            members, container = frame[0], frame[1]
+            if type(container) is list:
+                for node in members:
+                    if type(node) is Array or type(node) is Object:
+                        break
+                    container.append(node.accept(self))
+                else:
+                    node = None
+            else:
+                for key, (_, node) in members:
+                    if type(node) is Array or type(node) is Object:
+                        frame[2] = key
+                        break
+                    container[key] = node.accept(self)
+                else:
+                    node = None
+            if node is None:
+                stack.pop()
+                if not stack:
+                    return container
 
     def visit_boolean(self, boolean: Boolean):
         return boolean.value
@@ -21,10 +152,9 @@ class Composer(Visitor):
         return null.value
 
     def visit_number(self, number: Number):
-        _fdefs = {"e", "E", "."}
-        _vdefs = set(number.value)
-        _type = float if _fdefs & _vdefs else int
-        return _type(number.value)
+        if number.token.token_type is TokenType.FLOAT:
+            return float(number.value)
+        return int(number.value)
 
     def visit_string(self, string: String):
         return string.value
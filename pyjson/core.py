@@ -4,6 +4,8 @@ BaseTypes = dict | int | float | str | list | None | bool
 
 
 class Visitor(ty.Protocol):
+    __slots__ = ()
+
     def visit_object(self, object) -> ty.Any:
         ...
 
@@ -24,5 +26,7 @@ class Visitor(ty.Protocol):
 
 
 class Value(ty.Protocol):
+    __slots__ = ()
+
     def accept(self, visitor: Visitor) -> ty.Any:
         ...
@@ -0,0 +1,162 @@
+from .json import Buffer, _composed, _decode, _lexer, _detect_encoding
+from .lexer import LexerBackend, _SCANNER, _WINDOW
+from .parser import _numeric_array
+from .composer import Composer, KeyCache
+from .strings import unquote
+from .core import BaseTypes
+import typing as ty
+
+__all__ = ("Decoder",)
+
+# Returned by the fast path for whatever it leaves to loads
+_DECLINED: ty.Any = object()
+
+
+class Decoder:
+    """
+    loads with its options bound once, for hot loops over
+    small messages. Sources up to 64 KiB are matched by the
+    scanner in one findall and decoded in a single loop,
+    no Token objects, no parser instance, no Okay/Error
+    wrapping. Anything that loop does not accept, errors
+    included, is handed to the loads path, so values and
+    errors are always exactly loads'. A custom lexer, a
+    composer or keys always take that path.
+
+    decode keeps no state on the instance, so a Decoder
+    without a composer or keys may serve every thread.
+    A KeyCache, the composer's or keys, reorders its
+    OrderedDict on every lookup: give each thread its
+    own Decoder then, as CodecPool does.
+    """
+
+    def __init__(
+        self,
+        *,
+        lexer: type[LexerBackend] | None = None,
+        composer: Composer | None = None,
+        max_depth: int | None = None,
+        numeric_arrays: bool = False,
+        keys: KeyCache | None = None,
+    ) -> None:
+        if composer is not None:
+            _composed(numeric_arrays, keys)
+        self._fast = lexer is None and composer is None and keys is None
+        self._pack = _numeric_array if numeric_arrays else None
+        self.numeric_arrays = numeric_arrays
+        self.max_depth = max_depth
+        self.composer = composer
+        self.lexer = lexer
+        self.keys = keys
+
+    def decode(self, source: str | Buffer) -> BaseTypes:
+        if self._fast and len(source) <= _WINDOW:
+            text = source
+            if not isinstance(text, str) and _detect_encoding(text) == "utf-8":
+                try:
+                    text = str(text, "utf-8")
+                except UnicodeDecodeError:
+                    pass
+            if isinstance(text, str):
+                if (value := self._direct(text)) is not _DECLINED:
+                    return value
+        tokens = _lexer(source, self.lexer)
+        return _decode(
+            tokens, self.composer, self.max_depth, self.numeric_arrays, self.keys
+        )
+
+    def _direct(self, source: str) -> BaseTypes:
+        """
+        DirectParser.parse over the scanner matches, or
+        _DECLINED as soon as anything is off.
+        """
+        matches = _SCANNER.findall(source)
+        count = len(matches)
+        if not count or matches[0][1] not in ("{", "["):
+            return _DECLINED
+        max_depth = self.max_depth
+        if max_depth is None:
+            max_depth = count
+        pack = self._pack
+        # Frames are [container, pending mapping key]
+        stack: list[list] = []
+        index = 0
+        while True:
+            if index == count:
+                return _DECLINED
+            _, lexeme, fraction = matches[index]
+            index += 1
+            first = lexeme[0]
+            if first == "{" or first == "[":
+                if len(stack) >= max_depth or index == count:
+                    return _DECLINED
+                following = matches[index][1]
+                if first == "[":
+                    if following != "]":
+                        stack.append([[], None])
+                        continue
+                    value = [] if pack is None else pack([])
+                    index += 1
+                elif following == "}":
+                    value = {}
+                    index += 1
+                else:
+                    if (
+                        following[0] != '"'
+                        or len(following) < 2
+                        or index + 1 == count
+                        or matches[index + 1][1] != ":"
+                    ):
+                        return _DECLINED
+                    if "\\" in following:
+                        key = unquote(following)
+                    else:
+                        key = following[1:-1]
+                    stack.append([{}, key])
+                    index += 2
+                    continue
+            elif first == '"':
+                if len(lexeme) < 2:
+                    return _DECLINED
+                value = unquote(lexeme) if "\\" in lexeme else lexeme[1:-1]
+            elif fraction:
+                value = float(lexeme)
+            elif "0" <= lexeme[-1] <= "9":
+                value = int(lexeme)
+            elif lexeme == "true":
+                value = True
+            elif lexeme == "false":
+                value = False
+            elif lexeme == "null":
+                value = None
+            else:
+                return _DECLINED
+            while stack:
+                frame = stack[-1]
+                container, key = frame
+                if key is None:
+                    container.append(value)
+                else:
+                    container[key] = value
+                if index == count:
+                    return _DECLINED
+                separator = matches[index][1]
+                index += 1
+                if separator == ",":
+                    if key is not None:
+                        if index + 1 >= count:
+                            return _DECLINED
+                        key = matches[index][1]
+                        if key[0] != '"' or len(key) < 2:
+                            return _DECLINED
+                        if matches[index + 1][1] != ":":
+                            return _DECLINED
+                        frame[1] = unquote(key) if "\\" in key else key[1:-1]
+                        index += 2
+                    break
+                if separator != ("]" if key is None else "}"):
+                    return _DECLINED
+                stack.pop()
+                value = container if pack is None or key is not None else pack(container)
+            else:
+                return value if index == count else _DECLINED
@@ -0,0 +1,332 @@
+"""
+Incremental re-parsing for editors.
+
+    document = EditableDocument(text)
+    document.edit(offset, deleted, inserted)
+    document.root
+
+An edit re-lexes and re-parses only the members it touches
+of the innermost container it falls in, from the start of
+the first to the start of the member after the last, and
+splices them into the items of that container, every other
+node of the tree is kept as it is. Where each member sits
+in the text is tracked in a tree of spans, each container
+holding the offsets of its members in a Fenwick tree, so
+finding the members an edit falls in and shifting
+everything after them both take logarithmic time, whatever
+the size of the document.
+"""
+from .objects import Object, Array
+from .token import TokenBuffer, TokenType, _CODES
+from .exc import JsonDecoderError, MissingToken
+from .lexer import FastLexer
+from .parser import Parser
+from .core import Value
+
+__all__ = ("EditableDocument",)
+
+_OPENERS = _CODES[TokenType.LEFT_BRACE], _CODES[TokenType.LEFT_BRAKET]
+_CLOSERS = _CODES[TokenType.RIGHT_BRACE], _CODES[TokenType.RIGHT_BRAKET]
+_COMMA = _CODES[TokenType.COMMA]
+_EOF = _CODES[TokenType.EOF]
+
+
+class _Offsets:
+    """
+    Increasing offsets as a Fenwick tree over the gaps
+    between them, shifting every offset from an index on
+    costs as little as reading one.
+    """
+
+    __slots__ = "_tree", "_top"
+
+    def __init__(self, offsets: list[int]) -> None:
+        tree = [0]
+        tree.extend(b - a for a, b in zip([0] + offsets, offsets))
+        size = len(offsets)
+        for index in range(1, size + 1):
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        self._tree = tree
+        self._top = 1 << size.bit_length() >> 1
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def __getitem__(self, index: int) -> int:
+        tree, total = self._tree, 0
+        index += 1
+        while index:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+    def values(self) -> list[int]:
+        """Every offset, in linear time."""
+        tree = self._tree
+        sums = [0] * len(tree)
+        for index in range(1, len(tree)):
+            sums[index] = tree[index] + sums[index & (index - 1)]
+        return sums[1:]
+
+    def shift(self, index: int, delta: int) -> None:
+        """Move the offsets from index on by delta."""
+        tree = self._tree
+        index += 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def set(self, index: int, offset: int) -> None:
+        """Move the offset at index alone to offset."""
+        delta = offset - self[index]
+        if delta:
+            self.shift(index, delta)
+            self.shift(index + 1, -delta)
+
+    def before(self, offset: int) -> int:
+        """Index of the last offset short of offset, -1 for none."""
+        tree, index, step = self._tree, 0, self._top
+        while step:
+            if index + step < len(tree) and tree[index + step] < offset:
+                index += step
+                offset -= tree[index]
+            step >>= 1
+        return index - 1
+
+
+class _Span:
+    """
+    Where a container is: its length, brackets included,
+    and the offsets of its members from its own start, a
+    member starting at its key in a mapping. children
+    holds the span of every member whose value is a
+    container, None for the others. index is the position
+    of the member among those of the parent, lead how far
+    past the start of that member the container starts.
+    """
+
+    __slots__ = "node", "length", "children", "offsets", "parent", "index", "lead"
+
+    def __init__(self, parent: "_Span | None", index: int, lead: int) -> None:
+        self.children: list[_Span | None] = []
+        self.node: Object | Array
+        self.offsets: _Offsets
+        self.parent = parent
+        self.length = 0
+        self.index = index
+        self.lead = lead
+
+
+class _SpanParser(Parser):
+    """Parser keeping the containers it builds, in the order they close."""
+
+    def __init__(self, tokens: TokenBuffer) -> None:
+        super().__init__(tokens)
+        self.containers: list[Object | Array] = []
+
+    def Object(self, items: list) -> Object:  # type: ignore[override]
+        node = Object(items)
+        self.containers.append(node)
+        return node
+
+    def Array(self, items: list) -> Array:  # type: ignore[override]
+        node = Array(items)
+        self.containers.append(node)
+        return node
+
+    def members(self, mapping: bool, preceded: bool, followed: bool) -> list:
+        """
+        The items of a run of members, all the tokens hold,
+        sitting after an opening bracket or, when preceded,
+        a comma, and before the closing bracket or, when
+        followed, another member.
+        """
+        items: list = []
+        self._pull()
+        comma = False
+        while not self.empty():
+            key = self.consume_key() if mapping else None
+            value = self.consume_value()
+            items.append(value if key is None else (key, value))
+            if not (comma := self.match(TokenType.COMMA)):
+                break
+        f = self.peek()
+        if not self.empty() or (comma != followed if items else preceded and not followed):
+            raise MissingToken(
+                f"Expected a comma between members on line {f.line} column {f.column}"
+            )
+        return items
+
+
+def _spans(
+    buffer: TokenBuffer, containers: list[Object | Array]
+) -> tuple[list[int], list[_Span | None]]:
+    """
+    The start of every value or member at the top of
+    buffer, with its span if it is a container, spans
+    of nested containers filled in.
+    """
+    kinds, starts, ends = buffer.kinds, buffer.starts, buffer.ends
+    nodes = iter(containers)
+    # Frames are [span, start, member starts, children, expecting a member]
+    top: list = [None, 0, [], [], True]
+    stack = [top]
+    for index, kind in enumerate(kinds):
+        frame = stack[-1]
+        if kind in _CLOSERS:
+            span, start, members, children, _ = stack.pop()
+            span.length = ends[index] - start
+            span.offsets = _Offsets([member - start for member in members])
+            span.children = children
+            span.node = next(nodes)
+        elif kind == _COMMA:
+            frame[4] = True
+        elif kind != _EOF:
+            members, children = frame[2], frame[3]
+            if frame[4]:
+                frame[4] = False
+                members.append(starts[index])
+                children.append(None)
+            if kind in _OPENERS:
+                span = _Span(frame[0], len(children) - 1, starts[index] - members[-1])
+                children[-1] = span
+                stack.append([span, starts[index], [], [], True])
+    return top[2], top[3]
+
+
+def _parse(buffer: TokenBuffer) -> tuple[Value, _Span, int]:
+    """The AST of buffer, the span of its root and where it starts."""
+    parser = _SpanParser(buffer)
+    result = parser.parse()
+    if isinstance(result, Exception):
+        raise result.result
+    (start,), (span,) = _spans(buffer, parser.containers)
+    assert span is not None
+    return result.result, span, start
+
+
+class EditableDocument:
+    """
+    A document kept parsed as its text is edited. root is
+    the AST of text, None while text does not parse, error
+    then holds the reason. An edit replaces the members it
+    touches in the items of the container it was made in,
+    any other node is the one a previous parse built.
+    Tokens keep the line and column they had in the text
+    they were lexed from, so those of nodes after an edit
+    may be out of date. While text does not parse, or an
+    edit touches the brackets of the root, every edit
+    parses it whole.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.root: Value | None = None
+        self.error: JsonDecoderError | None = None
+        self._span: _Span | None = None
+        self._start = 0
+        self._parse_all()
+
+    def _parse_all(self) -> None:
+        try:
+            self.root, self._span, self._start = _parse(FastLexer(self.text).compact())
+            self.error = None
+        except JsonDecoderError as e:
+            self.root, self._span, self.error = None, None, e
+
+    def _parse_region(
+        self, start: int, stop: int, span: _Span, preceded: bool, followed: bool
+    ) -> tuple[list, list[int], list[_Span | None]]:
+        """The members of span in text[start:stop], where they start and their spans."""
+        text = self.text
+        linestart = text.rfind("\n", 0, start)
+        if linestart == -1:
+            line, column = 1, start
+        else:
+            line, column = text.count("\n", 0, start) + 1, start - linestart
+        buffer = FastLexer(text[start:stop]).compact(line, column)
+        parser = _SpanParser(buffer)
+        items = parser.members(isinstance(span.node, Object), preceded, followed)
+        members, children = _spans(buffer, parser.containers)
+        return items, [start + member for member in members], children
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> Value | None:
+        """
+        Replace deleted characters of the text at offset
+        by inserted, returning the new root.
+        """
+        text, end = self.text, offset + deleted
+        if not 0 <= offset <= end <= len(text):
+            raise IndexError(f"Edit {offset}:{end} out of range of {len(text)} characters")
+        self.text = text[:offset] + inserted + text[end:]
+        span, start = self._span, self._start
+        if span is None or not (start < offset and end < start + span.length):
+            self._parse_all()
+            return self.root
+        while (index := span.offsets.before(offset - start)) >= 0:
+            child = span.children[index]
+            if child is None:
+                break
+            child_start = start + span.offsets[index] + child.lead
+            if not (child_start < offset and end < child_start + child.length):
+                break
+            span, start = child, child_start
+        # The members from the last one starting before the edit
+        # to the last one starting at its end at the latest
+        offsets, count = span.offsets, len(span.offsets)
+        before = offsets.before(offset - start)
+        last = offsets.before(end - start + 1)
+        first = max(before, 0)
+        region = start + (offsets[first] if before >= 0 else 1)
+        stop = start + (offsets[last + 1] if last + 1 < count else span.length - 1)
+        delta = len(inserted) - deleted
+        try:
+            items, members, children = self._parse_region(
+                region, stop + delta, span, first > 0, last + 1 < count
+            )
+        except JsonDecoderError:
+            # The edit may have moved brackets, [[1, 2]] to [[1], [2]],
+            # so the text as a whole can parse when the members can not.
+            self._parse_all()
+            return self.root
+        self._splice(span, start, first, last, items, members, children, delta)
+        return self.root
+
+    def _splice(
+        self,
+        span: _Span,
+        start: int,
+        first: int,
+        last: int,
+        items: list,
+        members: list[int],
+        children: list[_Span | None],
+        delta: int,
+    ) -> None:
+        """Put items over the members first to last of span."""
+        span.node.value[first : last + 1] = items
+        span.children[first : last + 1] = children
+        for index, child in enumerate(children, first):
+            if child is not None:
+                child.parent, child.index = span, index
+        after = first + len(items)
+        if len(items) == last + 1 - first:
+            for index, member in enumerate(members, first):
+                span.offsets.set(index, member - start)
+            span.offsets.shift(after, delta)
+        else:
+            offsets = span.offsets.values()
+            offsets[first : last + 1] = [member - start for member in members]
+            for index in range(after, len(offsets)):
+                offsets[index] += delta
+                if (child := span.children[index]) is not None:
+                    child.index = index
+            span.offsets = _Offsets(offsets)
+        span.length += delta
+        parent, index = span.parent, span.index
+        while parent is not None:
+            parent.length += delta
+            parent.offsets.shift(index + 1, delta)
+            parent, index = parent.parent, parent.index
@@ -1,57 +1,202 @@
-from .formatter import Formatter, Object, Array, Null, Number, String, Boolean
+from .exc import JsonEncoderError
+from .strings import quote
+import typing as ty
+import sys
+
+__all__ = "Encoder", "encode", "iterencode"
+
+# Pieces collected before checking whether a chunk is full
+_BATCH = 512
+# Quoted mapping keys remembered per walk, records repeat them
+_KEYS = 1 << 12
+
+
+def _unsupported(value) -> JsonEncoderError:
+    return JsonEncoderError(
+        f"Object of type {type(value).__name__} is not JSON serializable"
+    )
+
+
+def _circular() -> JsonEncoderError:
+    return JsonEncoderError("Circular reference detected")
+
+
+class Encoder:
+    """
+    Writes Python objects out in a single walk, no Value
+    tree and no second rendering pass. Output matches
+    Formatter's: arrays stay on one line unless an item
+    spans several, which is decided when the array opens
+    so nothing written has to be revisited.
+    """
+
+    def __init__(self, indent: str | None = None) -> None:
+        self.indent = "" if indent is None else indent
+        self.pairsep = ":" if indent is None else ": "
+        self.arraysep = "," if indent is None else ", "
+        self.linesep = "" if indent is None else "\n"
+
+    def encode(self, root) -> str:
+        return "".join(self.iterencode(root, None))
+
+    def _scalar(self, value) -> str:
+        kind = type(value)
+        if kind is str:
+            if value.isprintable() and '"' not in value and "\\" not in value:
+                return '"' + value + '"'
+            return quote(value)
+        if kind is int or kind is float:
+            return str(value)
+        if kind is bool:
+            return "true" if value else "false"
+        if value is None:
+            return "null"
+        raise _unsupported(value)
+
+    def _multiline(self, array: list, known: dict[int, bool]) -> bool:
+        """
+        An array spans lines if any item does: a non-empty
+        object or an array that spans lines itself. Nested
+        arrays are searched depth first and the verdicts
+        kept in known until the walk leaves them, so each
+        array is searched at most once. Flat arrays, the
+        common case, are settled by a plain scan.
+        """
+        nested = False
+        for item in array:
+            kind = type(item)
+            if kind is dict:
+                if item:
+                    return True
+            elif kind is list:
+                nested = True
+        if not nested:
+            return False
+        if id(array) in known:
+            return known[id(array)]
+        path, items, visiting = [array], [iter(array)], {id(array)}
+        while path:
+            found = False
+            for item in items[-1]:
+                kind = type(item)
+                if kind is list:
+                    found = known.get(id(item))
+                    if found is None:
+                        if id(item) in visiting:
+                            raise _circular()
+                        visiting.add(id(item))
+                        path.append(item)
+                        items.append(iter(item))
+                        break
+                else:
+                    found = kind is dict and bool(item)
+                if found:
+                    break
+            else:
+                known[id(path[-1])] = False
+                visiting.discard(id(path.pop()))
+                items.pop()
+                continue
+            if found:
+                for node in path:
+                    known[id(node)] = True
+                return True
+        return False
+
+    def iterencode(self, root, chunk_size: int | None = 1 << 16) -> ty.Iterator[str]:
+        """
+        Yield the encoding of root in chunks of about
+        chunk_size characters, None yields it in one piece.
+        Only the open containers and the current chunk are
+        held, memory does not grow with the output. Pieces
+        are joined a batch at a time, and the batches once
+        more per chunk.
+        """
+        if type(root) is not dict and type(root) is not list:
+            yield self._scalar(root)
+            return
+        out: list[str] = []
+        append, scalar = out.append, self._scalar
+        indent, linesep = self.indent, self.linesep
+        pairsep, arraysep = self.pairsep, self.arraysep
+        mapsep = arraysep + linesep
+        batch = _BATCH if chunk_size is not None else sys.maxsize
+        # Joined batches of the current chunk and their length
+        joined: list[str] = []
+        size = 0
+        known: dict[int, bool] = {}
+        keys: dict[str, str] = {}
+        # Frames are [container, items, depth, count, multiline]
+        stack: list[list] = []
+        opened: set[int] = set()
+        value, depth = root, 0
+        while True:
+            if value is not None:
+                if id(value) in opened:
+                    raise _circular()
+                opened.add(id(value))
+                if type(value) is dict:
+                    stack.append([value, iter(value.items()), depth, 0, False])
+                else:
+                    multiline = bool(linesep) and self._multiline(value, known)
+                    append("[" + linesep if multiline else "[")
+                    stack.append([value, iter(value), depth, 0, multiline])
+                value = None
+            frame = stack[-1]
+            container, items, depth, count, multiline = frame
+            dent = indent * (depth + 1)
+            for item in items:
+                if len(out) >= batch:
+                    text = "".join(out)
+                    out.clear()
+                    joined.append(text)
+                    size += len(text)
+                    if size >= chunk_size:
+                        yield "".join(joined)
+                        joined.clear()
+                        size = 0
+                if type(container) is dict:
+                    key, item = item
+                    if type(key) is not str:
+                        raise JsonEncoderError(
+                            f"Keys must be str, not {type(key).__name__}"
+                        )
+                    append(("{" + linesep) if not count else mapsep)
+                    if (quoted := keys.get(key)) is None:
+                        quoted = quote(key)
+                        if len(keys) < _KEYS:
+                            keys[key] = quoted
+                    append(dent + quoted + pairsep)
+                elif multiline:
+                    append(arraysep + dent if count else dent)
+                elif count:
+                    append(arraysep)
+                count += 1
+                if type(item) is dict or type(item) is list:
+                    value, depth = item, depth + 1
+                    break
+                append(scalar(item))
+            frame[3] = count
+            if value is not None:
+                continue
+            stack.pop()
+            opened.discard(id(container))
+            if type(container) is dict:
+                append(linesep + indent * depth + "}" if count else "{}")
+            else:
+                append(linesep + indent * depth + "]" if multiline else "]")
+                known.pop(id(container), None)
+            if not stack:
+                joined.append("".join(out))
+                yield "".join(joined)
+                return
 
 
-def _dict(map: dict) -> Object:
-    pairs = []
-    for key, value in map.items():
-        if type(key) != str:
-            raise
-        if type(value) not in _encoders:
-            raise
-        pair = _encoders[str](key), _encoders[type(value)](value)
-        pairs.append(pair)
-    return Object(pairs)
-
-
-def _str(string: str) -> String:
-    return String(string)
-
-
-def _null(_: None) -> Null:
-    return Null(None)
-
-
-def _number(number: int | float) -> Number:
-    return Number(number)
-
-
-def _boolean(value: bool) -> Boolean:
-    return Boolean(value)
-
-
-def _array(array: list) -> Array:
-    values = []
-    for value in array:
-        if type(value) not in _encoders:
-            raise
-        values.append(_encoders[type(value)](value))
-    return Array(values)
-
-
-_encoders = {
-    dict: _dict,
-    str: _str,
-    None: _null,
-    int: _number,
-    float: _number,
-    bool: _boolean,
-    list: _array,
-}
+def encode(root, indent: str | None = None) -> str:
+    return Encoder(indent).encode(root)
 
 
-def encode(root, indent: str | None = None) -> str:
-    if type(root) not in _encoders:
-        raise
-    root = _encoders[type(root)](root)
-    formatter = Formatter(indent)
-    return formatter.format(root)
+def iterencode(
+    root, indent: str | None = None, chunk_size: int = 1 << 16
+) -> ty.Iterator[str]:
+    return Encoder(indent).iterencode(root, chunk_size)
@@ -0,0 +1,102 @@
+from .incremental import IncrementalLexer, PushParser
+from .core import BaseTypes
+from .token import Token
+from pathlib import Path
+import typing as ty
+
+__all__ = "EventParser", "iterparse"
+
+Event = tuple[str, str, BaseTypes]
+
+
+def _join(prefix: str, name: str) -> str:
+    return f"{prefix}.{name}" if prefix else name
+
+
+class EventParser(PushParser):
+    """
+    Turns the handler calls of PushParser into ijson
+    style (prefix, event, value) tuples. The prefix is
+    the dotted path to the current container or value,
+    array items are named `item`, the root is "".
+    Only the prefixes of the open containers are kept.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[Event] = []
+        self._prefixes: list[str] = []
+        self._children: list[str] = []
+
+    def _prefix(self) -> str:
+        return self._children[-1] if self._children else ""
+
+    def start_map(self, token: Token) -> None:
+        prefix = self._prefix()
+        self.events.append((prefix, "start_map", None))
+        self._prefixes.append(prefix)
+        self._children.append(prefix)
+
+    def map_key(self, key: str) -> None:
+        self.events.append((self._prefixes[-1], "map_key", key))
+        self._children[-1] = _join(self._prefixes[-1], key)
+
+    def end_map(self) -> None:
+        self._children.pop()
+        self.events.append((self._prefixes.pop(), "end_map", None))
+
+    def start_array(self, token: Token) -> None:
+        prefix = self._prefix()
+        self.events.append((prefix, "start_array", None))
+        self._prefixes.append(prefix)
+        self._children.append(_join(prefix, "item"))
+
+    def end_array(self) -> None:
+        self._children.pop()
+        self.events.append((self._prefixes.pop(), "end_array", None))
+
+    def value(self, value: BaseTypes) -> None:
+        self.events.append((self._prefix(), "value", value))
+
+
+def _chunks(
+    source: ty.IO | Path | str | bytes, chunk_size: int
+) -> ty.Iterator[str | bytes]:
+    if isinstance(source, Path):
+        with source.open("rb") as file:
+            yield from _chunks(file, chunk_size)
+    elif isinstance(source, (str, bytes)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+    else:
+        while chunk := source.read(chunk_size):
+            yield chunk
+
+
+def iterparse(
+    source: ty.IO | Path | str | bytes, chunk_size: int = 1 << 16
+) -> ty.Iterator[Event]:
+    """
+    Parse source, a Path, a text or binary file-like
+    object, or the document itself as str or bytes,
+    yielding (prefix, event, value) tuples as it goes:
+
+        >>> for event in iterparse('{"a": [1]}'):
+        ...     print(event)
+        ('', 'start_map', None)
+        ('', 'map_key', 'a')
+        ('a', 'start_array', None)
+        ('a.item', 'value', 1)
+        ('a', 'end_array', None)
+        ('', 'end_map', None)
+
+    Input is read chunk_size at a time, memory use is
+    bounded by the chunk size and the nesting depth.
+    """
+    lexer, parser = IncrementalLexer(), EventParser()
+    for chunk in _chunks(source, chunk_size):
+        parser.push(lexer.feed(chunk))
+        yield from parser.events
+        parser.events.clear()
+    parser.push(lexer.close())
+    yield from parser.events
@@ -10,6 +10,27 @@ class JsonDecoderError(JsonError):
     ...
 
 
+class RecordError(JsonDecoderError):
+    """
+    A record of a batch failed to decode, index is
+    its position in the batch, error the reason. line
+    is its line in the file, for JSON Lines input.
+    """
+
+    def __init__(
+        self, index: int, error: JsonDecoderError, line: int | None = None
+    ) -> None:
+        where = f"Record {index}" if line is None else f"Record {index} on line {line}"
+        super().__init__(f"{where}: {error}")
+        self.index = index
+        self.error = error
+        self.line = line
+
+
+class QueryError(JsonError):
+    ...
+
+
 class ParserError(JsonDecoderError):
     ...
 
@@ -38,6 +59,21 @@ class TrailingComma(ParserError):
     ...
 
 
+class NestingTooDeep(ParserError):
+    ...
+
+
+class SchemaError(ParserError):
+    """
+    The document does not fit the schema it is decoded
+    with, path is where, written the way select takes it.
+    """
+
+    def __init__(self, message: str, path: str) -> None:
+        super().__init__(f"{message} at {path}")
+        self.path = path
+
+
 class LexerError(JsonDecoderError):
     ...
 
@@ -52,3 +88,11 @@ class InvalidCharacter(LexerError):
 
 class UnexpectedEndOfString(LexerError):
     ...
+
+
+class InvalidNumber(LexerError):
+    ...
+
+
+class InvalidEscape(LexerError):
+    ...
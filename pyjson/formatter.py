@@ -1,8 +1,11 @@
-from typing import Any
+from typing import Any, Iterator
 from .core import Visitor, Value
+from .strings import quote
 
 
 class Object(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: list[tuple["String", Value]]) -> None:
         self.value = value
 
@@ -11,6 +14,8 @@ class Object(Value):
 
 
 class Array(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: list[Value]) -> None:
         self.value = value
 
@@ -19,14 +24,18 @@ class Array(Value):
 
 
 class String(Value):
+    __slots__ = ("value",)
+
     def __init__(self, string: str) -> None:
-        self.value = f'"{string}"'
+        self.value = quote(string)
 
     def accept(self, visitor: Visitor):
         return visitor.visit_string(self)
 
 
 class Number(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: int | float | str) -> None:
         self.value = str(value)
 
@@ -35,6 +44,8 @@ class Number(Value):
 
 
 class Null(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: None) -> None:
         self.value = "null"
 
@@ -43,6 +54,8 @@ class Null(Value):
 
 
 class Boolean(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: bool) -> None:
         self.value = str(value).lower()
 
@@ -50,6 +63,11 @@ class Boolean(Value):
         return visitor.visit_boolean(self)
 
 
+NULL = Null(None)
+TRUE = Boolean(True)
+FALSE = Boolean(False)
+
+
 class Formatter(Visitor):
     def __init__(self, indent=None) -> None:
         self.indent = "" if indent is None else indent
@@ -72,35 +90,68 @@ class Formatter(Visitor):
         return string.value
 
     def visit_array(self, array: Array) -> str:
-        brackets = '[', ']'
-        values = [value.accept(self) for value in array.value]
-        values = self.arraysep.join(values)
-        if '\n' in values:
-            self._depth += 1
-            values = [self.dent + value.accept(self) for value in array.value]
-            self._depth -= 1
-            brackets = '[' + self.linesep, self.linesep + self.dent + ']'
-            values = self.arraysep.join(values)
-        return brackets[0] + values + brackets[1]
-
-    def visit_object(self, object: Object) -> Any:
-        self._depth += 1
-        pairs = [
-            f"{self.dent}{key.accept(self)}{self.pairsep}{value.accept(self)}"
-            for key, value in object.value
-        ]
-        self._depth -= 1
-        if not pairs:
-            return "{}"
+        return self._format_container(array)
+
+    def visit_object(self, object: Object) -> str:
+        return self._format_container(object)
+
+    def _children(
+        self, node: Array | Object, depth: int
+    ) -> Iterator[tuple[str, Value]]:
+        if type(node) is Array:
+            return (("", value) for value in node.value)
+        dent = self.indent * depth
         return (
-            "{"
-            + self.linesep
-            + (self.arraysep + self.linesep).join(pairs)
-            + self.linesep
-            + self.dent
-            + "}"
+            (f"{dent}{key.accept(self)}{self.pairsep}", value)
+            for key, value in node.value
         )
 
+    def _close(self, node: Array | Object, parts: list[str], depth: int) -> str:
+        if type(node) is Object:
+            if not parts:
+                return "{}"
+            return (
+                "{"
+                + self.linesep
+                + (self.arraysep + self.linesep).join(parts)
+                + self.linesep
+                + self.indent * depth
+                + "}"
+            )
+        values = self.arraysep.join(parts)
+        if "\n" not in values:
+            return "[" + values + "]"
+        dent = self.indent * (depth + 1)
+        values = self.arraysep.join(dent + part for part in parts)
+        return "[" + self.linesep + values + self.linesep + self.indent * depth + "]"
+
+    def _format_container(self, root: Array | Object) -> str:
+        """
+        Nested containers are tracked on an explicit stack
+        rather than by recursing through accept. Children
+        are rendered once, one level deeper, an array only
+        goes multiline when one of them spans lines.
+        """
+        # Frames are [node, children, rendered parts, depth, child prefix]
+        children = self._children(root, self._depth + 1)
+        stack = [[root, children, [], self._depth, ""]]
+        while True:
+            frame = stack[-1]
+            node, children, parts, depth, _ = frame
+            for prefix, child in children:
+                if type(child) is Array or type(child) is Object:
+                    frame[4] = prefix
+                    children = self._children(child, depth + 2)
+                    stack.append([child, children, [], depth + 1, ""])
+                    break
+                parts.append(prefix + child.accept(self))
+            else:
+                text = self._close(node, parts, depth)
+                stack.pop()
+                if not stack:
+                    return text
+                stack[-1][2].append(stack[-1][4] + text)
+
     def visit_number(self, number: Number) -> Any:
         return number.value
 
@@ -0,0 +1,369 @@
+from .lexer import (
+    _SCANNER,
+    _SIMPLE_TYPES,
+    _KEYWORDS,
+    _STRING_PREFIX,
+    _scan_error,
+)
+from .parser import DirectParser
+from .token import TokenType, Token
+from .core import BaseTypes
+import typing as ty
+import codecs
+import enum
+import re
+from .exc import (
+    InvalidCharacter,
+    LexerError,
+    MultiRootObjects,
+    InvalidRoot,
+    MissingToken,
+    KeyError,
+    ValueError,
+)
+
+__all__ = "IncrementalLexer", "PushParser", "IncrementalDecoder"
+
+
+class _State(enum.IntEnum):
+    ROOT = enum.auto()
+    VALUE = enum.auto()
+    ARRAY_FIRST = enum.auto()
+    ARRAY_NEXT = enum.auto()
+    OBJECT_FIRST = enum.auto()
+    KEY = enum.auto()
+    COLON = enum.auto()
+    OBJECT_NEXT = enum.auto()
+    END = enum.auto()
+    DONE = enum.auto()
+
+
+# What may still follow a number at the end of a chunk
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+# What may be left of a string cut inside an escape sequence
+_ESCAPE_HEAD = re.compile(r"(?:\\(?:u[0-9a-fA-F]{0,3})?)?")
+
+
+def _incomplete(source: str, position: int) -> bool:
+    rest = source[position:]
+    if rest[0] == '"':
+        end = _STRING_PREFIX.match(rest).end()
+        return _ESCAPE_HEAD.fullmatch(rest, end) is not None
+    if rest == "-":
+        return True
+    keyword = _KEYWORDS.get(rest[0])
+    return keyword is not None and len(rest) < len(keyword) and keyword.startswith(rest)
+
+
+class IncrementalLexer:
+    """
+    Push counterpart of FastLexer. Every feed() returns
+    the tokens completed so far, a token cut by the end
+    of the chunk (half a string, a digit run, `tru`) is
+    kept back until the next chunk or close().
+    bytes are decoded as UTF-8, a multi-byte character
+    split between two chunks is fine, a BOM at the start
+    is dropped.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._chunks: list[str] = []
+        self._error: LexerError | None = None
+        self._open_string = False
+        self._linestart = 0
+        self._offset = 0
+        self._line = 1
+
+    def _decode(self, chunk: bytes, final: bool = False) -> str:
+        try:
+            return self._decoder.decode(chunk, final)
+        except UnicodeDecodeError as e:
+            # e.object is the chunk after any bytes held back from the last one
+            text = "".join(self._chunks) + e.object[: e.start].decode("utf-8")
+            line, linestart = self._line, self._linestart
+            if "\n" in text:
+                line += text.count("\n")
+                linestart = self._offset + text.rindex("\n")
+            column = self._offset + len(text) - linestart
+            raise InvalidCharacter(
+                f"Invalid UTF-8 input: {e.reason} on line {line} column {column}"
+            ) from e
+
+    def feed(self, chunk: str | bytes) -> list[Token]:
+        if not isinstance(chunk, str):
+            chunk = self._decode(chunk)
+        self._chunks.append(chunk)
+        if self._open_string and '"' not in chunk and "\n" not in chunk:
+            return []
+        return self._scan(final=False)
+
+    def close(self) -> ty.Iterator[Token]:
+        """
+        The remaining tokens and EOF. They come out lazily,
+        an error past the last of them is raised only once
+        the parser has taken them, as with feed().
+        """
+        self._chunks.append(self._decode(b"", final=True))
+        tokens = self._scan(final=True)
+        eof = Token(
+            token_type=TokenType.EOF,
+            column=self._offset - self._linestart,
+            line=self._line,
+            lexeme="",
+        )
+        return self._drain(tokens, eof)
+
+    def _drain(self, tokens: list[Token], eof: Token) -> ty.Iterator[Token]:
+        yield from tokens
+        if self._error is not None:
+            raise self._error
+        yield eof
+
+    def _scan(self, final: bool) -> list[Token]:
+        if self._error is not None:
+            raise self._error
+        source, tokens = "".join(self._chunks), []
+        offset, line, linestart = self._offset, self._line, self._linestart
+        position, self._open_string = 0, False
+        for space, lexeme, fraction in _SCANNER.findall(source):
+            if space:
+                position += len(space)
+                if "\n" in space:
+                    line += space.count("\n")
+                    linestart = offset + position - len(space) + space.rindex("\n")
+            token_type = _SIMPLE_TYPES.get(lexeme)
+            if token_type is None:
+                if lexeme[0] == '"' and len(lexeme) > 1:
+                    token_type = TokenType.STRING
+                elif fraction or "0" <= lexeme[-1] <= "9":
+                    token_type = TokenType.FLOAT if fraction else TokenType.INTEGER
+                    if not final and _NUMBER_TAIL.match(source, position + len(lexeme)):
+                        break
+                elif not final and _incomplete(source, position):
+                    self._open_string = lexeme == '"'
+                    break
+                elif tokens:
+                    # Let the parser see the tokens before the
+                    # error first, the next scan raises it.
+                    self._error = _scan_error(source, position, line)
+                    break
+                else:
+                    raise _scan_error(source, position, line)
+            token = Token(
+                token_type=token_type,
+                column=offset + position - linestart,
+                line=line,
+                lexeme=lexeme,
+            )
+            tokens.append(token)
+            position += len(lexeme)
+        else:
+            space = source[position:]
+            if "\n" in space:
+                line += space.count("\n")
+                linestart = offset + position + space.rindex("\n")
+            position = len(source)
+        self._chunks = [source[position:]]
+        self._offset = offset + position
+        self._line, self._linestart = line, linestart
+        return tokens
+
+
+class PushParser:
+    """
+    Token driven state machine for the grammar Parser
+    implements, for when the tokens arrive in batches.
+    Instead of building anything it reports what it sees
+    to the handler methods below, subclasses override
+    them. Errors and their messages match Parser's.
+    """
+
+    def __init__(self) -> None:
+        self._stack: list[Token] = []
+        self._state = _State.ROOT
+
+    def start_map(self, token: Token) -> None:
+        ...
+
+    def map_key(self, key: str) -> None:
+        ...
+
+    def end_map(self) -> None:
+        ...
+
+    def start_array(self, token: Token) -> None:
+        ...
+
+    def end_array(self) -> None:
+        ...
+
+    def value(self, value: BaseTypes) -> None:
+        ...
+
+    def push(self, tokens: ty.Iterable[Token]) -> None:
+        for token in tokens:
+            self._consume(token)
+
+    @property
+    def done(self) -> bool:
+        return self._state == _State.DONE
+
+    def _consume(self, token: Token) -> None:
+        kind = token.token_type
+        match self._state:
+            case _State.VALUE:
+                self._consume_value(token)
+            case _State.ARRAY_NEXT:
+                if kind == TokenType.COMMA:
+                    self._state = _State.VALUE
+                elif kind == TokenType.RIGHT_BRAKET:
+                    self._close(self.end_array)
+                else:
+                    raise MissingToken(
+                        f"Expected closing square bracket to close array on line {token.line} column {token.column}"
+                    )
+            case _State.OBJECT_NEXT:
+                if kind == TokenType.COMMA:
+                    self._state = _State.KEY
+                elif kind == TokenType.RIGHT_BRACE:
+                    self._close(self.end_map)
+                else:
+                    start = self._stack[-1]
+                    raise MissingToken(
+                        f"Mapping opened at line {start.line} column {start.column} was never closed."
+                    )
+            case _State.COLON:
+                if kind != TokenType.COLON:
+                    raise MissingToken(
+                        f"Expected a colon as key-value separator in mapping on line {token.line} column {token.column}"
+                    )
+                self._state = _State.VALUE
+            case _State.KEY | _State.OBJECT_FIRST:
+                if kind == TokenType.STRING:
+                    self.map_key(DirectParser.String(token))
+                    self._state = _State.COLON
+                elif kind == TokenType.RIGHT_BRACE and self._state == _State.OBJECT_FIRST:
+                    self._close(self.end_map)
+                else:
+                    raise KeyError(
+                        f"Expected map key to be a string, found {token.lexeme} on line {token.line} column {token.column}"
+                    )
+            case _State.ARRAY_FIRST:
+                if kind == TokenType.RIGHT_BRAKET:
+                    self._close(self.end_array)
+                else:
+                    self._consume_value(token)
+            case _State.ROOT:
+                if kind == TokenType.LEFT_BRACE or kind == TokenType.LEFT_BRAKET:
+                    self._consume_value(token)
+                elif kind == TokenType.EOF:
+                    raise InvalidRoot(
+                        f"Expected root object to be a mapping or an array, found {token.lexeme}"
+                    )
+                else:
+                    self._multiple_roots(token)
+            case _State.END:
+                if kind != TokenType.EOF:
+                    self._multiple_roots(token)
+                self._state = _State.DONE
+
+    def _consume_value(self, token: Token) -> None:
+        match token.token_type:
+            case TokenType.LEFT_BRACE:
+                self._stack.append(token)
+                self.start_map(token)
+                self._state = _State.OBJECT_FIRST
+            case TokenType.LEFT_BRAKET:
+                self._stack.append(token)
+                self.start_array(token)
+                self._state = _State.ARRAY_FIRST
+            case TokenType.INTEGER | TokenType.FLOAT:
+                self._scalar(DirectParser.Number(token, token.lexeme))
+            case TokenType.STRING:
+                self._scalar(DirectParser.String(token))
+            case TokenType.FALSE:
+                self._scalar(False)
+            case TokenType.TRUE:
+                self._scalar(True)
+            case TokenType.NULL:
+                self._scalar(None)
+            case _:
+                raise ValueError(
+                    f"Expected a value, found {token.lexeme} on line {token.line} column {token.column}"
+                )
+
+    def _scalar(self, value: BaseTypes) -> None:
+        self.value(value)
+        self._after_value()
+
+    def _close(self, handler: ty.Callable[[], None]) -> None:
+        self._stack.pop()
+        handler()
+        self._after_value()
+
+    def _after_value(self) -> None:
+        if not self._stack:
+            self._state = _State.END
+        elif self._stack[-1].token_type == TokenType.LEFT_BRACE:
+            self._state = _State.OBJECT_NEXT
+        else:
+            self._state = _State.ARRAY_NEXT
+
+    def _multiple_roots(self, f: Token) -> ty.NoReturn:
+        raise MultiRootObjects(
+            f"Expected one root object. line {f.line} column {f.column}: {f.lexeme}"
+        )
+
+
+class IncrementalDecoder(PushParser):
+    """
+    Decode a document that arrives in pieces:
+
+        decoder = IncrementalDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+        value = decoder.close()
+
+    Only the value under construction and the unfinished
+    tail of the last chunk are held in memory.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lexer = IncrementalLexer()
+        self._containers: list[dict | list] = []
+        self._keys: list[str | None] = []
+        self._result: BaseTypes = None
+
+    def feed(self, chunk: str | bytes) -> None:
+        self.push(self._lexer.feed(chunk))
+
+    def close(self) -> BaseTypes:
+        self.push(self._lexer.close())
+        return self._result
+
+    def start_map(self, token: Token) -> None:
+        self._containers.append({})
+        self._keys.append(None)
+
+    def start_array(self, token: Token) -> None:
+        self._containers.append([])
+        self._keys.append(None)
+
+    def map_key(self, key: str) -> None:
+        self._keys[-1] = key
+
+    def end_map(self) -> None:
+        self._keys.pop()
+        self.value(self._containers.pop())
+
+    end_array = end_map
+
+    def value(self, value: BaseTypes) -> None:
+        if not self._containers:
+            self._result = value
+        elif self._keys[-1] is None:
+            self._containers[-1].append(value)
+        else:
+            self._containers[-1][self._keys[-1]] = value
@@ -1,28 +1,329 @@
-from .encoder import encode as dumps
-from .composer import Composer
-from .core import BaseTypes
-from .parser import Parser
+from .encoder import encode, iterencode
+from .stats import Stats, _hooks
+from .composer import Composer, KeyCache
+from .exc import InvalidCharacter
+from .core import BaseTypes, Value
+from .parser import Parser, DirectParser, NumericParser
 from pathlib import Path
-from .lexer import Lexer
+from .lexer import LexerBackend, FastLexer, BytesLexer
+import typing as ty
+import codecs
+import mmap
+import io
 
-__all__ = "load", "loads", "dumps", "dump"
+__all__ = "load", "loads", "dumps", "dump", "iterencode", "parse", "documents", "Document"
 
+Buffer = bytes | bytearray | memoryview
+# Longest first, the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
 
-def load(filepath: Path | str):
+
+def _detect_encoding(data: Buffer | mmap.mmap) -> str:
+    """
+    The codec for data, from its BOM or else from where
+    its first characters, ASCII in any JSON text, have
+    zero bytes (RFC 4627). UTF-8 when there is neither.
+    """
+    head = bytes(data[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if len(head) >= 4:
+        if not head[0]:
+            return "utf-16-be" if head[1] else "utf-32-be"
+        if not head[1]:
+            return "utf-16-le" if head[2] or head[3] else "utf-32-le"
+    elif len(head) == 2:
+        if not head[0]:
+            return "utf-16-be"
+        if not head[1]:
+            return "utf-16-le"
+    return "utf-8"
+
+
+def _lexer(
+    source: str | Buffer | mmap.mmap, lexer: type[LexerBackend] | None
+) -> LexerBackend:
+    """
+    A lexer over source. Without a lexer UTF-8 buffers
+    go to BytesLexer as they are, no copy and no decode,
+    other encodings and text lexers get decoded text.
+    """
+    if isinstance(source, str):
+        return (lexer or FastLexer)(source)
+    encoding = _detect_encoding(source)
+    if lexer is None and encoding.startswith("utf-8"):
+        return BytesLexer(source)
+    try:
+        text = str(source, encoding)
+    except UnicodeDecodeError as e:
+        raise InvalidCharacter(f"Invalid {encoding} input: {e.reason}") from e
+    return (lexer or FastLexer)(text)
+
+
+def load(
+    filepath: Path | str,
+    *,
+    lexer: type[LexerBackend] | None = None,
+    composer: Composer | None = None,
+    max_depth: int | None = None,
+    numeric_arrays: bool = False,
+    keys: KeyCache | None = None,
+):
+    """
+    The file is memory mapped and, as with loads of
+    bytes, UTF-8 is lexed by BytesLexer in place, nothing
+    but the string and number lexemes is ever decoded.
+    Other encodings, or a lexer, get the decoded text.
+    Files that can not be mapped, pipes, sockets, empty
+    or procfs files reporting a size of 0, are read.
+    """
     filepath = Path(str(filepath))
-    return loads(filepath.read_text())
+    with filepath.open("rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = file.read()
+            tokens = _lexer(data, lexer)
+            return _decode(tokens, composer, max_depth, numeric_arrays, keys)
+        with buffer:
+            tokens = _lexer(buffer, lexer)
+            return _decode(tokens, composer, max_depth, numeric_arrays, keys)
 
 
-def dump(filepath: Path | str, obj):
-    Path(str(filepath)).write_text(dumps(obj))
+def dumps(obj, indent: str | None = None, *, stats: Stats | None = None) -> str:
+    """stats, or a registered hook, gets the encode phase."""
+    if stats is None and not _hooks:
+        return encode(obj, indent)
+    stats = Stats() if stats is None else stats
+    stats.start("dumps", 0)
+    try:
+        text = stats.time("encode", encode, obj, indent)
+        stats.bytes = len(text.encode())
+        stats.count_values(obj)
+        return text
+    except Exception as e:
+        stats.error = e
+        raise
+    finally:
+        stats.report()
 
 
-def loads(source: str) -> BaseTypes:
-    tokens = Lexer(source).tokenize()
-    if isinstance(tokens, Exception):
-        raise tokens.result
-    ast = Parser(tokens.result).parse()
+def dump(
+    obj,
+    fp: ty.IO | Path | str,
+    *,
+    indent: str | None = None,
+    chunk_size: int = 1 << 16,
+) -> None:
+    """
+    Write obj to fp, a path, a text or binary file-like
+    object or a socket, chunk_size characters at a time
+    so the full output is never held in memory. Paths
+    and binary targets get UTF-8.
+    """
+    if isinstance(fp, (Path, str)):
+        with Path(fp).open("w", encoding="utf-8") as file:
+            return dump(obj, file, indent=indent, chunk_size=chunk_size)
+    if hasattr(fp, "sendall"):
+        write, binary = fp.sendall, True
+    else:
+        write = fp.write
+        binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase))
+    for chunk in iterencode(obj, indent, chunk_size):
+        write(chunk.encode() if binary else chunk)
+
+
+def _parse(lexer: LexerBackend, max_depth: int | None) -> Value:
+    # The AST holds on to its scalar tokens, views into a
+    # TokenBuffer are cheaper to keep than Token objects.
+    tokens = lexer.compact() if isinstance(lexer, FastLexer) else lexer.stream()
+    ast = Parser(tokens, max_depth).parse()
     if isinstance(ast, Exception):
         raise ast.result
-    composer = Composer().compose
-    return composer(ast.result)
+    return ast.result
+
+
+def _decode(
+    lexer: LexerBackend,
+    composer: Composer | None,
+    max_depth: int | None,
+    numeric_arrays: bool = False,
+    keys: KeyCache | None = None,
+) -> BaseTypes:
+    if composer is not None:
+        _composed(numeric_arrays, keys)
+        return composer.compose(_parse(lexer, max_depth))
+    parser = NumericParser if numeric_arrays else DirectParser
+    value = parser(lexer.stream(), max_depth, keys).parse()
+    if isinstance(value, Exception):
+        raise value.result
+    return value.result
+
+
+def _composed(numeric_arrays: bool, keys: KeyCache | None) -> None:
+    """Reject the options a composer takes over."""
+    if numeric_arrays:
+        raise TypeError("numeric_arrays can not be used with a composer")
+    if keys is not None:
+        raise TypeError("keys can not be used with a composer, give them to it")
+
+
+def _size(source: str | Buffer) -> int:
+    if isinstance(source, str):
+        return len(source.encode("utf-8", "surrogatepass"))
+    return source.nbytes if isinstance(source, memoryview) else len(source)
+
+
+def _instrumented(
+    source: str | Buffer,
+    lexer: type[LexerBackend] | None,
+    composer: Composer | None,
+    max_depth: int | None,
+    numeric_arrays: bool,
+    keys: KeyCache | None,
+    stats: Stats,
+) -> BaseTypes:
+    """_decode, with stats timing every phase."""
+    stats.start("loads", _size(source))
+    tokens = None
+    try:
+        backend = stats.time("lex", _lexer, source, lexer)
+        if composer is not None:
+            _composed(numeric_arrays, keys)
+            if isinstance(backend, FastLexer):
+                buffer = stats.time("lex", backend.compact)
+                tokens = stats.lex(buffer)
+            else:
+                tokens = stats.lex(backend.stream())
+            ast = stats.time("parse", _drained, Parser(tokens, max_depth).parse, tokens)
+            if isinstance(ast, Exception):
+                raise ast.result
+            return stats.time("compose", composer.compose, ast.result)
+        parser = NumericParser if numeric_arrays else DirectParser
+        tokens = stats.lex(backend.stream())
+        parse = parser(tokens, max_depth, keys).parse
+        value = stats.time("parse", _drained, parse, tokens)
+        if isinstance(value, Exception):
+            raise value.result
+        return value.result
+    except Exception as e:
+        stats.error = e
+        raise
+    finally:
+        if tokens is not None:
+            tokens.close()
+        stats.report()
+
+
+def _drained(parse: ty.Callable, tokens: ty.Generator) -> ty.Any:
+    """parse(), closing tokens so their phase is in before it ends."""
+    try:
+        return parse()
+    finally:
+        tokens.close()
+
+
+def parse(
+    source: str | Buffer,
+    *,
+    lexer: type[LexerBackend] | None = None,
+    max_depth: int | None = None,
+) -> Value:
+    return _parse(_lexer(source, lexer), max_depth)
+
+
+def loads(
+    source: str | Buffer,
+    *,
+    lexer: type[LexerBackend] | None = None,
+    composer: Composer | None = None,
+    max_depth: int | None = None,
+    numeric_arrays: bool = False,
+    keys: KeyCache | None = None,
+    stats: Stats | None = None,
+) -> BaseTypes:
+    """
+    source may be text or a buffer in UTF-8, 16 or 32,
+    told apart by BOM or zero bytes. Without a lexer a
+    UTF-8 buffer is lexed in place by BytesLexer, the
+    default for text being FastLexer.
+
+    With numeric_arrays, arrays holding only numbers
+    come back as NumPy arrays when NumPy is installed,
+    array.array otherwise, see NumericParser.
+
+    With keys, a KeyCache, mapping keys are interned and
+    mappings built on cached shapes, see DirectParser.
+    Reusing one cache across calls shares keys between
+    them, it is not safe to share between threads.
+
+    stats, or a registered hook, gets the time and work of
+    every phase, see pyjson.stats.
+
+    A lexer error anywhere in source wins over a parser
+    error, whatever the options, see Parser.
+    """
+    if stats is not None or _hooks:
+        stats = Stats() if stats is None else stats
+        return _instrumented(
+            source, lexer, composer, max_depth, numeric_arrays, keys, stats
+        )
+    return _decode(_lexer(source, lexer), composer, max_depth, numeric_arrays, keys)
+
+
+class Document(ty.NamedTuple):
+    value: BaseTypes
+    start: int
+    end: int
+
+
+class _LineStarts:
+    """
+    Byte offset of a (line, column) pair as the lexers
+    count them, scanning for newlines only as far as the
+    lines asked for, which may never go back.
+    """
+
+    def __init__(self, source: bytes) -> None:
+        self._source = source
+        self._linestart = 0
+        self._line = 1
+
+    def offset(self, line: int, column: int) -> int:
+        while self._line < line:
+            start = self._linestart + 1 if self._line > 1 else 0
+            self._linestart = self._source.find(b"\n", start)
+            self._line += 1
+        return self._linestart + column
+
+
+def documents(
+    source: str | bytes, *, max_depth: int | None = None
+) -> ty.Iterator[Document]:
+    """
+    Decode a stream of concatenated or newline delimited
+    documents in one lexer pass, yielding each one with
+    the byte offsets of its first and past its last
+    character in the UTF-8 source. Roots may be scalars.
+
+        >>> for document in documents('{"a": 1}\\n[2] "x"'):
+        ...     print(document)
+        Document(value={'a': 1}, start=0, end=8)
+        Document(value=[2], start=9, end=12)
+        Document(value='x', start=13, end=16)
+    """
+    if isinstance(source, str):
+        source = source.encode()
+    lines = _LineStarts(source)
+    parser = DirectParser(BytesLexer(source).stream(), max_depth)
+    for value, first, last in parser.documents():
+        start = lines.offset(first.line, first.column)
+        end = lines.offset(last.line, last.column) + len(last.lexeme.encode())
+        yield Document(value, start, end)
@@ -2,12 +2,35 @@ from .exc import (
     MultilineString,
     UnexpectedEndOfString,
     InvalidCharacter,
+    InvalidNumber,
+    InvalidEscape,
     LexerError,
 )
 from .result import Okay, Error
-from .token import TokenType, Token
+from .token import TokenType, Token, TokenBuffer, _CODES
+import typing as ty
+import codecs
+import mmap
+import re
 
-__all__ = ("Lexer",)
+__all__ = "LexerBackend", "Lexer", "FastLexer", "BytesLexer"
+
+
+class LexerBackend(ty.Protocol):
+    """
+    What Parser and loads need from a lexer: built
+    from the source, it hands out its tokens either
+    all at once or one at a time, ending with EOF.
+    """
+
+    def __init__(self, source: str) -> None:
+        ...
+
+    def tokenize(self) -> Okay[list[Token]] | Error[LexerError]:
+        ...
+
+    def stream(self) -> ty.Iterator[Token]:
+        ...
 
 
 class Lexer:
@@ -40,6 +63,15 @@ class Lexer:
         except LexerError as e:
             return Error(e)
 
+    def stream(self) -> ty.Iterator[Token]:
+        """
+        Yield the tokens one at a time, raising the
+        LexerError instead of returning it. Lexer has
+        to scan the whole source first, FastLexer
+        produces them lazily.
+        """
+        return iter(self._scan())
+
     def _scan(self) -> list[Token]:
         while not self.empty():
             match self.peek():
@@ -60,8 +92,6 @@ class Lexer:
                     self.add_token(TokenType.COLON, 1)
                 case ",":
                     self.add_token(TokenType.COMMA, 1)
-                case "-":
-                    self.add_token(TokenType.MINUS, 1)
                 case '"':
                     self.string()
                 case "t":
@@ -70,12 +100,8 @@ class Lexer:
                     self.match(TokenType.FALSE, "false")
                 case "n":
                     self.match(TokenType.NULL, "null")
-                case ".":
-                    self.add_token(TokenType.DOT, 1)
-                case "e" | "E":
-                    self.add_token(TokenType.E, 1)
                 case char:
-                    if self.isdigit(char):
+                    if char == "-" or self.isdigit(char):
                         self.number()
                     else:
                         raise InvalidCharacter
@@ -97,9 +123,40 @@ class Lexer:
         )
 
     def number(self):
+        """
+        A whole number, -?(0|[1-9][0-9]*)(.[0-9]+)?([eE][+-]?[0-9]+)?
+        as RFC 8259 has it, an INTEGER unless it has a
+        fraction or an exponent.
+        """
+        token_type, where = TokenType.INTEGER, None
+        if self.peek() == "-":
+            self.advance()
+            where = "after the minus sign"
+        if not self.empty() and self.peek() == "0":
+            self.advance()
+        else:
+            self.digits(where)
+        if not self.empty() and self.peek() == ".":
+            self.advance()
+            self.digits("after the decimal point")
+            token_type = TokenType.FLOAT
+        if not self.empty() and self.peek() in "eE":
+            self.advance()
+            if not self.empty() and self.peek() in "+-":
+                self.advance()
+            self.digits("in the exponent")
+            token_type = TokenType.FLOAT
+        self.add_token(token_type)
+
+    def digits(self, where: str | None = None):
+        """
+        Consume a digit run, where says what the digits
+        are for when at least one is required.
+        """
+        if where is not None and (self.empty() or not self.isdigit(self.peek())):
+            raise InvalidNumber(f"Expected a digit {where}. line {self._line}")
         while not self.empty() and self.isdigit(self.peek()):
             self.advance()
-        self.add_token(TokenType.NUMBER)
 
     def string(self):
         self.advance()
@@ -108,12 +165,26 @@ class Lexer:
             self.advance()
             if char == '"':
                 return self.add_token(TokenType.STRING)
+            if char == "\\":
+                self.escape()
             if char == "\n":
                 raise MultilineString(
                     f"Multiline string are not supported. line {self._line}"
                 )
         raise UnexpectedEndOfString(f"Expected a closing quote. line {self._line}")
 
+    def escape(self):
+        """
+        Consume the rest of an escape sequence, the
+        backslash is already consumed.
+        """
+        sequence = self._source[self._current - 1 : self._current + 5]
+        if (valid := _VALID_ESCAPE.match(sequence)) is None:
+            raise InvalidEscape(
+                f"Invalid escape sequence {sequence[:2]!r}. line {self._line}"
+            )
+        self.advance(len(valid[0]) - 1)
+
     def match(self, token_type: TokenType, string: str):
         for char in string:
             if self.peek() != char:
@@ -151,3 +222,262 @@ class Lexer:
 
     def isdigit(self, char: str) -> bool:
         return ord("0") <= ord(char) <= ord("9")
+
+
+_ESCAPE_SEQUENCE = r'\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})'
+_VALID_ESCAPE = re.compile(_ESCAPE_SEQUENCE)
+# A whole string, the unrolled loop keeps strings without
+# escapes, the common case, to a single character class run.
+_STRING = rf'"[^"\\\n]*(?:{_ESCAPE_SEQUENCE}[^"\\\n]*)*"'
+# The longest string prefix free of errors
+_STRING_PREFIX = re.compile(_STRING[:-1])
+# The third group holds the fraction and exponent of a number,
+# it is empty for integers and for everything that is not a number.
+_SCANNER = re.compile(
+    r"""
+    ([ \t\v\f\n]*)
+    (
+        """
+    + _STRING
+    + r"""
+        | -?(?:0|[1-9][0-9]*)((?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+        | [][{}:,] | true | false | null | [^ \t\v\f\n]
+    )
+    """,
+    re.VERBOSE,
+)
+# No token spans a newline, so the source is scanned in windows
+# that end on one, bounding the size of each findall batch.
+_WINDOW = 1 << 16
+_SIMPLE_TYPES = {
+    "]": TokenType.RIGHT_BRAKET,
+    "}": TokenType.RIGHT_BRACE,
+    "[": TokenType.LEFT_BRAKET,
+    "{": TokenType.LEFT_BRACE,
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    "true": TokenType.TRUE,
+    "false": TokenType.FALSE,
+    "null": TokenType.NULL,
+}
+_SIMPLE_CODES = {lexeme: _CODES[kind] for lexeme, kind in _SIMPLE_TYPES.items()}
+_KEYWORDS = {"t": "true", "f": "false", "n": "null"}
+
+
+class FastLexer(Lexer):
+    """
+    Drop-in replacement for Lexer that lets a compiled
+    regular expression jump over whitespace runs, string
+    bodies and digit runs instead of dispatching on every
+    character. Emits the same Token stream and raises the
+    same LexerError subclasses as Lexer.
+    """
+
+    def _scan(self) -> list[Token]:
+        self._tokens.extend(self.stream())
+        return self._tokens
+
+    def stream(self) -> ty.Iterator[Token]:
+        source, stop = self._source, self._stop
+        line, position = self._line, self._current
+        linestart = position - self._column
+        while position < stop:
+            end = source.find("\n", position + _WINDOW) + 1 or stop
+            for space, lexeme, fraction in _SCANNER.findall(source, position, end):
+                if space:
+                    position += len(space)
+                    if "\n" in space:
+                        line += space.count("\n")
+                        linestart = position - len(space) + space.rindex("\n")
+                token_type = _SIMPLE_TYPES.get(lexeme)
+                if token_type is None:
+                    if fraction:
+                        token_type = TokenType.FLOAT
+                    elif lexeme[0] == '"' and len(lexeme) > 1:
+                        token_type = TokenType.STRING
+                    elif "0" <= lexeme[-1] <= "9":
+                        token_type = TokenType.INTEGER
+                    else:
+                        raise _scan_error(source, position, line)
+                yield Token(
+                    token_type=token_type,
+                    column=position - linestart,
+                    line=line,
+                    lexeme=lexeme,
+                )
+                position += len(lexeme)
+            if position < end:
+                space = source[position:end]
+                if "\n" in space:
+                    line += space.count("\n")
+                    linestart = position + space.rindex("\n")
+                position = end
+        self._line, self._current = line, stop
+        self._start_column = self._column = stop - linestart
+        yield self._eof_token()
+
+    def compact(self, line: int = 1, column: int = 0) -> TokenBuffer:
+        """
+        Tokenize into a TokenBuffer, no Token object is
+        created and lines are not tracked while scanning.
+        line and column are where the source starts, when
+        it is a fragment of a larger document.
+        """
+        source, buffer = self._source, TokenBuffer(self._source, line, column)
+        kinds, starts = buffer.kinds.append, buffer.starts.append
+        ends = buffer.ends.append
+        string, integer = _CODES[TokenType.STRING], _CODES[TokenType.INTEGER]
+        real = _CODES[TokenType.FLOAT]
+        position, stop = 0, self._stop
+        while position < stop:
+            end = source.find("\n", position + _WINDOW) + 1 or stop
+            for space, lexeme, fraction in _SCANNER.findall(source, position, end):
+                position += len(space)
+                kind = _SIMPLE_CODES.get(lexeme)
+                if kind is None:
+                    if fraction:
+                        kind = real
+                    elif lexeme[0] == '"' and len(lexeme) > 1:
+                        kind = string
+                    elif "0" <= lexeme[-1] <= "9":
+                        kind = integer
+                    else:
+                        line = buffer.location(position)[0]
+                        raise _scan_error(source, position, line)
+                kinds(kind)
+                starts(position)
+                position += len(lexeme)
+                ends(position)
+            position = end
+        kinds(_CODES[TokenType.EOF])
+        starts(len(source))
+        ends(len(source))
+        return buffer
+
+
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+def _scan_error(source: str, position: int, line: int) -> LexerError:
+    char = source[position]
+    if char == "-":
+        return InvalidNumber(f"Expected a digit after the minus sign. line {line}")
+    if char in ".eE" and position and "0" <= source[position - 1] <= "9":
+        start = position - 1
+        while start and source[start - 1] in _NUMBER_CHARS:
+            start -= 1
+        number = source[start:position]
+        # A second fraction or exponent follows a complete number
+        if "e" in number or "E" in number or char == "." and "." in number:
+            return InvalidCharacter(f"Invalid character {char!r} on line {line}")
+        where = "after the decimal point" if char == "." else "in the exponent"
+        return InvalidNumber(f"Expected a digit {where}. line {line}")
+    if char == '"':
+        end = _STRING_PREFIX.match(source, position).end()
+        if source.startswith("\\", end):
+            sequence = source[end : end + 2]
+            return InvalidEscape(f"Invalid escape sequence {sequence!r}. line {line}")
+        if end < len(source):
+            return MultilineString(f"Multiline string are not supported. line {line}")
+        return UnexpectedEndOfString(f"Expected a closing quote. line {line}")
+    if char in _KEYWORDS:
+        string = _KEYWORDS[char]
+        lexeme = source[position : position + len(string)]
+        found = next((b for a, b in zip(string, lexeme) if a != b), "")
+        return InvalidCharacter(
+            f"Invalid token encountered {found!r}, did you mean {string!r}"
+        )
+    return InvalidCharacter(f"Invalid character {char!r} on line {line}")
+
+
+_BYTES_NUMBER = b"0123456789.eE+-"
+_BYTES_SCANNER = re.compile(_SCANNER.pattern.encode(), re.VERBOSE)
+_BYTES_SIMPLE = {
+    lexeme.encode(): (token_type, lexeme)
+    for lexeme, token_type in _SIMPLE_TYPES.items()
+}
+_NEWLINE = re.compile(b"\n")
+
+
+def _newline(source: ty.Any, start: int) -> int:
+    """
+    source.find(b"\\n", start) for any buffer, memoryview
+    has no find.
+    """
+    found = _NEWLINE.search(source, start)
+    return -1 if found is None else found.start()
+
+
+class BytesLexer(Lexer):
+    """
+    FastLexer over UTF-8 encoded bytes, or any buffer
+    such as an mmap, without decoding the source up front.
+    Only string and number lexemes are decoded, as they
+    are reached, which is also when UTF-8 is validated.
+    A leading BOM is skipped. Columns count bytes rather
+    than characters, the BOM included.
+    """
+
+    def __init__(self, source: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        if isinstance(source, memoryview):
+            source = source.cast("B")
+        super().__init__(source)  # type: ignore[arg-type]
+
+    def _scan(self) -> list[Token]:
+        self._tokens.extend(self.stream())
+        return self._tokens
+
+    def stream(self) -> ty.Iterator[Token]:
+        source, stop = self._source, self._stop
+        line, linestart, position = self._line, 0, 0
+        if source[:3] == codecs.BOM_UTF8:
+            position = 3
+        while position < stop:
+            end = _newline(source, position + _WINDOW) + 1 or stop
+            for space, lexeme, fraction in _BYTES_SCANNER.findall(source, position, end):
+                if space:
+                    position += len(space)
+                    if b"\n" in space:
+                        line += space.count(b"\n")
+                        linestart = position - len(space) + space.rindex(b"\n")
+                simple = _BYTES_SIMPLE.get(lexeme)
+                if simple is not None:
+                    token_type, text = simple
+                elif fraction:
+                    token_type, text = TokenType.FLOAT, lexeme.decode("ascii")
+                elif lexeme[0] == 34 and len(lexeme) > 1:  # b'"'
+                    token_type, text = TokenType.STRING, self._decode(lexeme, line)
+                elif 48 <= lexeme[-1] <= 57:  # b"0" to b"9"
+                    token_type, text = TokenType.INTEGER, lexeme.decode("ascii")
+                else:
+                    # From the start of any number before, errors look back at it
+                    start = position
+                    while start and source[start - 1] in _BYTES_NUMBER:
+                        start -= 1
+                    newline = _newline(source, position)
+                    text = bytes(source[start : newline + 1 or stop])
+                    raise _scan_error(
+                        text.decode("utf-8", "replace"), position - start, line
+                    )
+                yield Token(
+                    token_type=token_type,
+                    column=position - linestart,
+                    line=line,
+                    lexeme=text,
+                )
+                position += len(lexeme)
+            if position < end:
+                space = bytes(source[position:end])
+                if b"\n" in space:
+                    line += space.count(b"\n")
+                    linestart = position + space.rindex(b"\n")
+                position = end
+        self._line, self._current = line, stop
+        self._start_column = self._column = stop - linestart
+        yield self._eof_token()
+
+    def _decode(self, lexeme: bytes, line: int) -> str:
+        try:
+            return lexeme.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise InvalidCharacter(f"Invalid UTF-8 in string. line {line}") from e
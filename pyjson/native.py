@@ -0,0 +1,195 @@
+from .lexer import FastLexer
+from .exc import LexerError
+from .token import TokenType, Token, TokenBuffer, _CODES
+from array import array
+from pathlib import Path
+import typing as ty
+import ctypes
+import sys
+import os
+
+__all__ = "NativeLexer", "available", "compare"
+
+# Token kinds in the order of cppjson/tokens.def, Error has no counterpart
+_KINDS = (
+    TokenType.EOF,
+    TokenType.NULL,
+    TokenType.TRUE,
+    TokenType.FALSE,
+    TokenType.INTEGER,
+    TokenType.STRING,
+    None,
+    TokenType.COMMA,
+    TokenType.COLON,
+    TokenType.LEFT_BRACE,
+    TokenType.LEFT_BRAKET,
+    TokenType.RIGHT_BRACE,
+    TokenType.RIGHT_BRAKET,
+    TokenType.FLOAT,
+)
+_INVALID = 255
+_TRANSLATE = bytes(
+    _CODES[kind] if kind is not None else _INVALID for kind in _KINDS
+).ljust(256, bytes((_INVALID,)))
+# Tokens fetched from the library per call
+_BATCH = 1 << 12
+_LIBRARY = Path(__file__).resolve().parent.parent / "cppjson" / "libcppjson.so"
+
+Batch = tuple[array, array, array, array, array]
+
+
+def _load() -> ctypes.CDLL | None:
+    """
+    Load the compiled cppjson lexer, built by running
+    make in cppjson/, or from the path in the
+    PYJSON_CPPJSON environment variable.
+    """
+    try:
+        library = ctypes.CDLL(os.environ.get("PYJSON_CPPJSON", str(_LIBRARY)))
+    except OSError:
+        return None
+    library.cppjson_lexer_new.argtypes = ctypes.c_char_p, ctypes.c_size_t
+    library.cppjson_lexer_new.restype = ctypes.c_void_p
+    library.cppjson_lexer_free.argtypes = (ctypes.c_void_p,)
+    library.cppjson_lexer_free.restype = None
+    library.cppjson_lexer_next.argtypes = (
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+        *(ctypes.c_void_p,) * 5,
+    )
+    library.cppjson_lexer_next.restype = ctypes.c_size_t
+    return library
+
+
+_library = _load()
+
+
+def available() -> bool:
+    return _library is not None
+
+
+class NativeLexer(FastLexer):
+    """
+    FastLexer running on the Json::Lexer of cppjson
+    through ctypes. Whatever the C++ lexer rejects is
+    handed back to FastLexer from the rejected token
+    on, so tokens and errors stay exactly FastLexer's.
+    Without the library, or for non-ASCII sources where
+    byte and character offsets part, it is FastLexer.
+    """
+
+    def _native(self) -> bool:
+        return _library is not None and self._source.isascii()
+
+    def _batches(self) -> ty.Iterator[Batch]:
+        """
+        Yield the kinds, start and end offsets, lines and
+        columns of the tokens, a batch of arrays at a time.
+        """
+        source = self._source.encode("ascii")
+        batch: Batch = (
+            array("B", bytes(_BATCH)),
+            array("Q", bytes(8 * _BATCH)),
+            array("Q", bytes(8 * _BATCH)),
+            array("I", bytes(4 * _BATCH)),
+            array("I", bytes(4 * _BATCH)),
+        )
+        pointers = [part.buffer_info()[0] for part in batch]
+        handle = _library.cppjson_lexer_new(source, len(source))
+        try:
+            while count := _library.cppjson_lexer_next(handle, _BATCH, *pointers):
+                yield tuple(part[:count] for part in batch)  # type: ignore[misc]
+        finally:
+            _library.cppjson_lexer_free(handle)
+
+    def stream(self) -> ty.Iterator[Token]:
+        if not self._native():
+            yield from super().stream()
+            return
+        source = self._source
+        for batch in self._batches():
+            for kind, start, end, line, column in zip(*batch):
+                token_type = _KINDS[kind]
+                if token_type is None:
+                    self._current, self._line, self._column = start, line, column
+                    yield from super().stream()
+                    return
+                if token_type is TokenType.EOF:
+                    self._line, self._current = line, self._stop
+                    self._start_column = self._column = column
+                    yield self._eof_token()
+                    return
+                yield Token(
+                    token_type=token_type,
+                    column=column,
+                    line=line,
+                    lexeme=source[start:end],
+                )
+
+    def compact(self, line: int = 1, column: int = 0) -> TokenBuffer:
+        if not self._native():
+            return super().compact(line, column)
+        # The buffer computes locations itself, from line and column
+        buffer = TokenBuffer(self._source, line, column)
+        buffer.starts, buffer.ends = array("Q"), array("Q")
+        for kinds, starts, ends, _, _ in self._batches():
+            codes = kinds.tobytes().translate(_TRANSLATE)
+            if _INVALID in codes:
+                return super().compact(line, column)
+            buffer.kinds.frombytes(codes)
+            buffer.starts.extend(starts)
+            buffer.ends.extend(ends)
+        return buffer
+
+
+def _tokens(lexer: FastLexer) -> tuple[list[tuple], str | None]:
+    tokens: list[tuple] = []
+    try:
+        for token in lexer.stream():
+            tokens.append((token.token_type, token.lexeme, token.line, token.column))
+    except LexerError as e:
+        return tokens, f"{type(e).__name__}: {e}"
+    return tokens, None
+
+
+def _compact(lexer: FastLexer) -> tuple[list, list, list] | str:
+    try:
+        buffer = lexer.compact()
+    except LexerError as e:
+        return f"{type(e).__name__}: {e}"
+    return buffer.kinds.tolist(), buffer.starts.tolist(), buffer.ends.tolist()
+
+
+def compare(source: str) -> str | None:
+    """
+    Tokenize source with FastLexer and NativeLexer,
+    streamed and compact, describe the first
+    difference, None if they agree.
+    """
+    expected, error = _tokens(FastLexer(source))
+    found, native_error = _tokens(NativeLexer(source))
+    for index, (a, b) in enumerate(zip(expected, found)):
+        if a != b:
+            return f"token {index}: expected {a}, found {b}"
+    if len(expected) != len(found):
+        return f"expected {len(expected)} tokens, found {len(found)}"
+    if error != native_error:
+        return f"expected {error}, found {native_error}"
+    expected_buffer = _compact(FastLexer(source))
+    if expected_buffer != (found_buffer := _compact(NativeLexer(source))):
+        if isinstance(expected_buffer, str) or isinstance(found_buffer, str):
+            return f"compact: expected {expected_buffer}, found {found_buffer}"
+        return "compact: the token arrays differ"
+    return None
+
+
+if __name__ == "__main__":
+    # python -m pyjson.native FILE... checks both backends agree
+    if not available():
+        sys.exit(f"cppjson library not found at {_LIBRARY}, run make in cppjson/")
+    failed = False
+    for name in sys.argv[1:]:
+        if (difference := compare(Path(name).read_text())) is not None:
+            print(f"{name}: {difference}")
+            failed = True
+    sys.exit(failed)
@@ -1,8 +1,11 @@
 from .core import Visitor, Value
+from .strings import unquote
 from .token import Token
 
 
 class Object(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: list[tuple["String", Value]]) -> None:
         self.value = value
 
@@ -11,6 +14,8 @@ class Object(Value):
 
 
 class Array(Value):
+    __slots__ = ("value",)
+
     def __init__(self, value: list[Value]) -> None:
         self.value = value
 
@@ -19,8 +24,11 @@ class Array(Value):
 
 
 class String(Value):
+    __slots__ = "value", "token"
+
     def __init__(self, token: Token) -> None:
-        self.value = token.lexeme[1:-1]
+        lexeme = token.lexeme
+        self.value = unquote(lexeme) if "\\" in lexeme else lexeme[1:-1]
         self.token = token
 
     def accept(self, visitor: Visitor):
@@ -28,6 +36,8 @@ class String(Value):
 
 
 class Number(Value):
+    __slots__ = "value", "token"
+
     def __init__(self, token: Token, value: str) -> None:
         self.value = value
         self.token = token
@@ -37,7 +47,9 @@ class Number(Value):
 
 
 class Null(Value):
-    def __init__(self, token: Token) -> None:
+    __slots__ = "value", "token"
+
+    def __init__(self, token: Token | None) -> None:
         self.value = None
         self.token = token
 
@@ -46,9 +58,26 @@ class Null(Value):
 
 
 class Boolean(Value):
-    def __init__(self, token: Token, value: bool) -> None:
+    __slots__ = "value", "token"
+
+    def __init__(self, token: Token | None, value: bool) -> None:
         self.value = value
         self.token = token
 
     def accept(self, visitor: Visitor):
         return visitor.visit_boolean(self)
+
+
+# Shared, token-less leaves for trees that do not need
+# to point back into the source, see null and boolean.
+NULL = Null(None)
+TRUE = Boolean(None, True)
+FALSE = Boolean(None, False)
+
+
+def null(_: Token) -> Null:
+    return NULL
+
+
+def boolean(_: Token, value: bool) -> Boolean:
+    return TRUE if value else FALSE
@@ -1,45 +1,144 @@
-from .objects import Object, String, Number, Null, Boolean, Array
-from .token import TokenType, Token
+from .objects import Object, String, Number, Array, null, boolean
+from .composer import KeyCache
+from .token import TokenType, Token, TokenBuffer, TokenView, _CODES
 from .result import Okay, Error
+from .strings import unquote
+from array import array
 import typing as ty
 from .exc import (
+    JsonDecoderError,
+    LexerError,
     ParserError,
     MultiRootObjects,
     InvalidRoot,
     MissingToken,
     KeyError,
     ValueError,
+    NestingTooDeep,
 )
 
-__all__ = ("Parser",)
-
-T = ty.TypeVar("T")
+__all__ = "Parser", "DirectParser", "NumericParser"
 
 if ty.TYPE_CHECKING:
     from .core import Value
 else:
     Value = None
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+    """
+    Builds the AST out of a token stream. The tokens
+    are pulled one at a time, so a lazy stream such as
+    FastLexer.stream() is never materialised. A
+    TokenBuffer is read through its arrays instead,
+    a token view is only made for the tokens a node
+    or an error message asks for, punctuation has none.
+    Node construction goes through the class attributes
+    below, subclasses swap them to build other trees.
+
+    A lexer error wins over a parser error wherever the
+    two are in the text, as when the text was lexed whole
+    before parsing: on a parser error the tokens left are
+    pulled to look for one. Only the error path pays it,
+    whatever the lexer, stream or compact.
+    """
+
+    Object: ty.Callable[[list], ty.Any] = Object
+    Array: ty.Callable[[list], ty.Any] = Array
+    String: ty.Callable[[Token], ty.Any] = String
+    Number: ty.Callable[[Token, str], ty.Any] = Number
+    Boolean: ty.Callable[[Token, bool], ty.Any] = staticmethod(boolean)
+    Null: ty.Callable[[Token], ty.Any] = staticmethod(null)
+
+    def __init__(
+        self, tokens: ty.Iterable[Token], max_depth: int | None = None
+    ) -> None:
+        self._max_depth = max_depth
         self._start: Token | None = None
-        self._tokens = tokens
-        self._current = 0
+        self._buffer: TokenBuffer | None = None
+        if isinstance(tokens, TokenBuffer):
+            self._buffer, self._kinds, self._index = tokens, tokens.kinds, -1
+            self._current: Token | TokenView | None = None
+            self._pull = self._buffered_pull  # type: ignore[method-assign]
+            self.advance = self._buffered_advance  # type: ignore[method-assign]
+            self.match = self._buffered_match  # type: ignore[method-assign]
+            self.check = self._buffered_check  # type: ignore[method-assign]
+            self.empty = self._buffered_empty  # type: ignore[method-assign]
+            self.peek = self._buffered_peek  # type: ignore[method-assign]
+        else:
+            self._next = iter(tokens).__next__
 
-    def parse(self) -> Error[ParserError] | Okay[Value]:
+    def parse(self) -> Error[JsonDecoderError] | Okay[Value]:
         try:
+            self._pull()
             return Okay(self._scan_root())
         except ParserError as e:
-            return Error(e)
+            return Error(self.lexed(e))
+
+    def lexed(self, error: ParserError) -> JsonDecoderError:
+        """error, or the lexer error the tokens left run into."""
+        if self._buffer is not None:
+            return error  # A TokenBuffer was lexed whole
+        try:
+            while self._current.token_type != TokenType.EOF:
+                self._current = self._next()
+        except LexerError as e:
+            return e
+        return error
+
+    def parse_value(self) -> Error[JsonDecoderError] | Okay[Value]:
+        """
+        Like parse but the root may be any value,
+        scalars included, used for document fragments.
+        """
+        try:
+            self._pull()
+            value = self.consume_value()
+            if not self.empty():
+                f = self.peek()
+                raise MultiRootObjects(
+                    f"Expected one root object. line {f.line} column {f.column}: {f.lexeme}"
+                )
+            return Okay(value)
+        except ParserError as e:
+            return Error(self.lexed(e))
+
+    def documents(self) -> ty.Iterator[tuple[Value, Token, Token]]:
+        """
+        Multi-document mode for concatenated and JSON
+        Lines streams: yield (root, first token, last
+        token) for every root value in turn, scalars
+        included, all out of the one token stream.
+        Errors are raised rather than returned.
+        """
+        buffer, last = self._buffer, None
+        if buffer is None:
+            pull = self._next
+
+            def next_token() -> Token:
+                nonlocal last
+                last = self._current
+                return pull()
+
+            self._next = next_token
+            self._current = pull()
+        else:
+            self._pull()
+        while not self.empty():
+            first = self.peek()
+            root = self.consume_value()
+            yield root, first, last if buffer is None else buffer[self._index - 1]
 
     def _scan_root(self) -> Value:
         root: Value | None = None
         match self.peek().token_type:
-            case TokenType.LEFT_BRACE:
-                root = self.consume_object()
-            case TokenType.LEFT_BRAKET:
-                root = self.consume_array()
+            case TokenType.LEFT_BRACE | TokenType.LEFT_BRAKET:
+                root = self.consume_value()
         f = self.peek()
         if not self.empty():
             raise MultiRootObjects(
@@ -51,122 +150,113 @@ class Parser:
             )
         return root
 
-    def consume_object(self) -> Object:
-        start = self.advance()
-        endtype: TokenType = TokenType.RIGHT_BRACE
-        object = Object(
-            self.consume_comma_sep_values(self.consume_object_pair, endtype)
-        )
-        if self.peek().token_type != endtype:
-            raise MissingToken(
-                f"Mapping opened at line {start.line} column {start.column} was never closed."
-            )
-        self.advance()
-        return object
+    def consume_value(self):
+        """
+        Consume one value of any nesting depth. Open
+        containers live on an explicit stack instead of
+        the call stack, so only max_depth bounds nesting.
+        """
+        # Frames are [items, opening token, pending mapping key]
+        stack: list[list] = []
+        max_depth = self._max_depth
+        while True:
+            f = self.peek()
+            kind = f.token_type
+            if kind == TokenType.LEFT_BRACE or kind == TokenType.LEFT_BRAKET:
+                if max_depth is not None and len(stack) >= max_depth:
+                    raise NestingTooDeep(
+                        f"Nesting exceeds the maximum depth of {max_depth} on line {f.line} column {f.column}"
+                    )
+                self.advance()
+                if kind == TokenType.LEFT_BRACE:
+                    if not self.match(TokenType.RIGHT_BRACE):
+                        stack.append([[], f, self.consume_key()])
+                        continue
+                    value = self.Object([])
+                else:
+                    if not self.match(TokenType.RIGHT_BRAKET):
+                        stack.append([[], f, None])
+                        continue
+                    value = self.Array([])
+            else:
+                value = self.consume_scalar()
+            while stack:
+                frame = stack[-1]
+                items, start, key = frame
+                items.append(value if key is None else (key, value))
+                if self.match(TokenType.COMMA):
+                    if key is not None:
+                        frame[2] = self.consume_key()
+                    break
+                stack.pop()
+                if key is not None:
+                    if self.peek().token_type != TokenType.RIGHT_BRACE:
+                        raise MissingToken(
+                            f"Mapping opened at line {start.line} column {start.column} was never closed."
+                        )
+                    self.advance()
+                    value = self.Object(items)
+                else:
+                    if not self.match(TokenType.RIGHT_BRAKET):
+                        f = self.peek()
+                        raise MissingToken(
+                            f"Expected closing square bracket to close array on line {f.line} column {f.column}"
+                        )
+                    value = self.Array(items)
+            else:
+                return value
 
-    def consume_object_pair(self):
+    def consume_key(self):
         if not self.check(TokenType.STRING):
             f = self.peek()
             raise KeyError(
                 f"Expected map key to be a string, found {f.lexeme} on line {f.line} column {f.column}"
             )
         key = self.consume_string()
-        if not self.check(TokenType.COLON):
+        if not self.match(TokenType.COLON):
             f = self.peek()
             raise MissingToken(
                 f"Expected a colon as key-value separator in mapping on line {f.line} column {f.column}"
             )
-        self.advance()
-        value = self.consume_value()
-        return key, value
-
-    def consume_array(self) -> Array:
-        self.advance()
-        endtype: TokenType = TokenType.RIGHT_BRAKET
-        array = Array(self.consume_comma_sep_values(self.consume_value, endtype))
-        if not self.match(endtype):
-            f = self.peek()
-            raise MissingToken(
-                f"Expected closing square bracket to close array on line {f.line} column {f.column}"
-            )
-        return array
-
-    def consume_comma_sep_values(
-        self, consumer: ty.Callable[[], T], endtype: TokenType
-    ) -> list[T]:
-        values: list[T] = []
-        if self.peek().token_type == endtype:
-            return values
-        values.append(consumer())
-        while self.match(TokenType.COMMA):
-            values.append(consumer())
-        return values
+        return key
 
-    def consume_value(self):
+    def consume_scalar(self):
         match (f := self.peek()).token_type:
-            case TokenType.LEFT_BRACE:
-                return self.consume_object()
-            case TokenType.LEFT_BRAKET:
-                return self.consume_array()
-            case TokenType.MINUS | TokenType.NUMBER:
+            case TokenType.INTEGER | TokenType.FLOAT:
                 return self.consume_number()
             case TokenType.STRING:
                 return self.consume_string()
             case TokenType.FALSE:
-                return Boolean(self.advance(), False)
+                return self.Boolean(self.advance(), False)
             case TokenType.TRUE:
-                return Boolean(self.advance(), True)
+                return self.Boolean(self.advance(), True)
             case TokenType.NULL:
-                return Null(self.advance())
+                return self.Null(self.advance())
             case _:
                 raise ValueError(
                     f"Expected a value, found {f.lexeme} on line {f.line} column {f.column}"
                 )
 
-    def consume_number(self) -> Number:
-        buffer, token = [], self.peek()
-        consume = lambda: buffer.append(self.advance().lexeme)
-        if self.check(TokenType.MINUS):
-            consume()
-        if not self.check(TokenType.NUMBER):
-            f = self.peek()
-            raise MissingToken(
-                f"Expected a number after the minus token on line {f.line} column {f.column}"
-            )
-        consume()
-        if self.check(TokenType.DOT):
-            consume()
-            if not self.check(TokenType.NUMBER):
-                f = self.peek()
-                raise MissingToken(
-                    f"Expected a number after the dot token on line {f.line} column {f.column}"
-                )
-            consume()
-        if self.check(TokenType.E):
-            consume()
-            if self.check(TokenType.MINUS):
-                consume()
-            if not self.check(TokenType.NUMBER):
-                f = self.peek()
-                raise MissingToken(
-                    f"Expected a number after the e token on line {f.line} column {f.column}"
-                )
-            consume()
-        return Number(token, "".join(buffer))
+    def consume_number(self):
+        token = self.advance()
+        return self.Number(token, token.lexeme)
 
     def consume_string(self):
-        return String(self.advance())
+        return self.String(self.advance())
 
     def advance(self):
-        consumed = self.peek()
-        self._current += 1
+        consumed = self._current
+        if consumed.token_type != TokenType.EOF:
+            self._current = self._next()
         return consumed
 
-    def match(self, *token_types: TokenType):
+    def match(self, *token_types: TokenType) -> bool:
         current = self.peek().token_type
         for token_type in token_types:
             if token_type == current:
-                return self.advance()
+                self.advance()
+                return True
+        return False
 
     def check(self, token_type):
         return not self.empty() and self.peek().token_type == token_type
@@ -175,4 +265,139 @@ class Parser:
         return self.peek().token_type == TokenType.EOF
 
     def peek(self) -> Token:
-        return self._tokens[self._current]
+        return self._current
+
+    def _pull(self) -> None:
+        """Make the first token current."""
+        self._current = self._next()
+
+    # The same primitives over a TokenBuffer, the current
+    # token is an index and its view is made on a peek
+
+    def _buffered_pull(self) -> None:
+        self._index += 1
+        self._current = None
+
+    def _buffered_advance(self) -> TokenView:
+        consumed = self._buffered_peek()
+        if self._kinds[self._index] != _EOF:
+            self._index += 1
+            self._current = None
+        return consumed
+
+    def _buffered_match(self, *token_types: TokenType) -> bool:
+        current = self._kinds[self._index]
+        for token_type in token_types:
+            if _CODES[token_type] == current:
+                if current != _EOF:
+                    self._index += 1
+                    self._current = None
+                return True
+        return False
+
+    def _buffered_check(self, token_type: TokenType) -> bool:
+        current = self._kinds[self._index]
+        return current != _EOF and current == _CODES[token_type]
+
+    def _buffered_empty(self) -> bool:
+        return self._kinds[self._index] == _EOF
+
+    def _buffered_peek(self) -> TokenView:
+        view = self._current
+        if view is None:
+            view = self._current = TokenView(self._buffer, self._index)
+        return view
+
+
+_EOF = _CODES[TokenType.EOF]
+
+
+def _string(token: Token) -> str:
+    lexeme = token.lexeme
+    if "\\" in lexeme:
+        return unquote(lexeme)
+    return lexeme[1:-1]
+
+
+def _number(token: Token, value: str) -> int | float:
+    if token.token_type is TokenType.FLOAT:
+        return float(value)
+    return int(value)
+
+
+def _boolean(_: Token, value: bool) -> bool:
+    return value
+
+
+def _null(_: Token) -> None:
+    return None
+
+
+class DirectParser(Parser):
+    """
+    Parser that builds dict, list, str, int, float,
+    bool and None straight away instead of an AST,
+    fusing the Parser and Composer passes. Same
+    errors, same messages. With a KeyCache mappings
+    are built on the cached shape of their keys, as
+    Composer does, so records sharing a key set share
+    their key strings.
+    """
+
+    Object = dict
+    Array = list
+    String = staticmethod(_string)
+    Number = staticmethod(_number)
+    Boolean = staticmethod(_boolean)
+    Null = staticmethod(_null)
+
+    def __init__(
+        self,
+        tokens: ty.Iterable[Token],
+        max_depth: int | None = None,
+        keys: KeyCache | None = None,
+    ) -> None:
+        super().__init__(tokens, max_depth)
+        if keys is not None:
+            self._shape = keys.shape
+            self.Object = self._shaped  # type: ignore[assignment]
+
+    def _shaped(self, items: list[tuple[str, ty.Any]]) -> dict:
+        # Duplicate keys keep the first position and the last value, as dict does
+        if not items:
+            return {}
+        keys, values = zip(*items)
+        return dict(zip(self._shape(keys), values))
+
+
+def _numeric_array(items: list) -> ty.Any:
+    """
+    items as a NumPy array, or an array.array without
+    NumPy, when they are all numbers: int64 ('q') when
+    all are ints, float64 ('d') otherwise. Anything else,
+    empty arrays and ints out of int64 range stay lists.
+    """
+    kinds = set(map(type, items))
+    if kinds == {int}:
+        typecode = "q"
+    elif kinds == {float} or kinds == {int, float}:
+        typecode = "d"
+    else:
+        return items
+    try:
+        if numpy is not None:
+            dtype = numpy.int64 if typecode == "q" else numpy.float64
+            return numpy.array(items, dtype=dtype)
+        return array(typecode, items)
+    except OverflowError:
+        return items
+
+
+class NumericParser(DirectParser):
+    """
+    DirectParser that packs arrays of numbers, such as
+    timeseries or embeddings, into NumPy or array.array
+    arrays instead of lists of Python numbers.
+    """
+
+    Array = staticmethod(_numeric_array)
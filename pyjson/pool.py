@@ -0,0 +1,73 @@
+"""
+Thread-safe decoding and encoding for threaded servers.
+
+Lexer, Parser and Formatter instances hold cursor state
+and are never safe to share. CodecPool hands every thread
+its own Decoder and Encoder, built on first use, so loads
+and dumps on one pool may be called from any number of
+threads. Nothing mutable is shared between threads, which
+keeps the pool correct without the GIL as well, on the
+free-threaded build.
+
+    python -m benchmarks scenario pool
+
+runs a stress check across threads and reports how the
+throughput scales with the thread count.
+"""
+from .composer import KeyCache
+from .json import Buffer
+from .encoder import Encoder
+from .decoder import Decoder
+from .core import BaseTypes
+import threading
+
+__all__ = ("CodecPool",)
+
+
+class CodecPool:
+    """
+    Per-thread Decoder and Encoder instances sharing one
+    set of options. With intern_keys every thread interns
+    mapping keys in a KeyCache of its own.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_depth: int | None = None,
+        numeric_arrays: bool = False,
+        intern_keys: bool = False,
+        indent: str | None = None,
+    ) -> None:
+        self._local = threading.local()
+        self.numeric_arrays = numeric_arrays
+        self.intern_keys = intern_keys
+        self.max_depth = max_depth
+        self.indent = indent
+
+    def decoder(self) -> Decoder:
+        """The calling thread's Decoder."""
+        try:
+            return self._local.decoder
+        except AttributeError:
+            decoder = self._local.decoder = Decoder(
+                max_depth=self.max_depth,
+                numeric_arrays=self.numeric_arrays,
+                keys=KeyCache() if self.intern_keys else None,
+            )
+            return decoder
+
+    def encoder(self) -> Encoder:
+        """The calling thread's Encoder."""
+        try:
+            return self._local.encoder
+        except AttributeError:
+            encoder = self._local.encoder = Encoder(self.indent)
+            return encoder
+
+    def loads(self, source: str | Buffer) -> BaseTypes:
+        return self.decoder().decode(source)
+
+    def dumps(self, obj) -> str:
+        return self.encoder().encode(obj)
+
@@ -0,0 +1,243 @@
+from .exc import QueryError, MissingToken, MultiRootObjects, KeyError, ValueError
+from .lexer import FastLexer, _STRING, _scan_error
+from .parser import DirectParser
+from .strings import unquote
+from .core import BaseTypes
+import typing as ty
+import re
+
+__all__ = ("select",)
+
+_STEP = re.compile(
+    r"""
+    \.(?P<name>[A-Za-z_][\w-]*)
+    | \.(?P<star>\*)
+    | \[(?:
+        (?P<index>-?[0-9]+)
+        | (?P<wildcard>\*)
+        | (?P<dquoted>"[^"\\]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\]*)*")
+        | '(?P<squoted>[^']*)'
+    )\]
+    """,
+    re.VERBOSE,
+)
+_SPACE = re.compile(r"[ \t\v\f\n]*")
+# Everything up to the next bracket, strings included since
+# they may hold brackets, stops early on an unterminated string.
+# Escapes there are only told apart from the closing quote.
+_FILLER = re.compile(r'(?:[^"\[\]{}]+|"[^"\\\n]*(?:\\.[^"\\\n]*)*")*')
+_SCALAR = re.compile(_STRING + r'|[^" \t\v\f\n,\]}][^ \t\v\f\n,\]}]*')
+_CLOSE = {"[": "]", "{": "}"}
+
+Step = str | int | None  # key, index, wildcard
+
+
+def _compile(path: str) -> list[Step]:
+    if not path.startswith("$"):
+        raise QueryError(f"Path must start at the root '$': {path!r}")
+    steps: list[Step] = []
+    position = 1
+    while position < len(path):
+        if (m := _STEP.match(path, position)) is None:
+            raise QueryError(f"Invalid path step at {position} in {path!r}")
+        match m.lastgroup:
+            case "name" | "squoted":
+                steps.append(m.group(m.lastgroup))
+            case "dquoted":
+                steps.append(unquote(m.group("dquoted")))
+            case "index":
+                steps.append(int(m.group("index")))
+            case _:
+                steps.append(None)
+        position = m.end()
+    return steps
+
+
+def _location(source: str, position: int) -> tuple[int, int]:
+    linestart = max(source.rfind("\n", 0, position), 0)
+    return source.count("\n", 0, position) + 1, position - linestart
+
+
+class _Selector:
+    def __init__(self, source: str, steps: list[Step]) -> None:
+        self.matches: list[BaseTypes] = []
+        self._source = source
+        self._steps = steps
+        # The last position located, its line and line start
+        self._seen = 0, 1, 0
+
+    def _space(self, position: int) -> int:
+        return _SPACE.match(self._source, position).end()
+
+    def _where(self, position: int) -> tuple[int, int]:
+        """
+        _location of a match, newlines are counted from
+        the last one since matches come in source order.
+        """
+        source, (last, line, linestart) = self._source, self._seen
+        if position < last:
+            return _location(source, position)
+        if newlines := source.count("\n", last, position):
+            line += newlines
+            linestart = source.rfind("\n", last, position)
+        self._seen = position, line, linestart
+        return line, position - linestart
+
+    def _found(self, position: int) -> str:
+        return self._source[position : position + 1] or "end of source"
+
+    def _skip(self, position: int) -> int:
+        source = self._source
+        if position >= len(source):
+            line, column = _location(source, position)
+            raise ValueError(
+                f"Expected a value, found end of source on line {line} column {column}"
+            )
+        if source[position] not in "[{":
+            if m := _SCALAR.match(source, position):
+                return m.end()
+            raise _scan_error(source, position, _location(source, position)[0])
+        # Where the containers left to close were opened
+        start, openers = position, []
+        while True:
+            position = _FILLER.match(source, position).end()
+            if position >= len(source):
+                line, column = _location(source, start)
+                raise MissingToken(
+                    f"Container opened at line {line} column {column} was never closed."
+                )
+            char = source[position]
+            if char == "[" or char == "{":
+                openers.append(position)
+            elif char == "]" or char == "}":
+                opener = openers.pop()
+                if _CLOSE[source[opener]] != char:
+                    self._mismatched(opener, position)
+                if not openers:
+                    return position + 1
+            else:
+                raise _scan_error(source, position, _location(source, position)[0])
+            position += 1
+
+    def _mismatched(self, opener: int, position: int) -> ty.NoReturn:
+        """Raise what loads does on a closing bracket of the wrong kind."""
+        if self._source[opener] == "{":
+            line, column = _location(self._source, opener)
+            raise MissingToken(
+                f"Mapping opened at line {line} column {column} was never closed."
+            )
+        line, column = _location(self._source, position)
+        raise MissingToken(
+            f"Expected closing square bracket to close array on line {line} column {column}"
+        )
+
+    def _members(
+        self, position: int, close: str
+    ) -> ty.Iterator[tuple[str | None, int]]:
+        """
+        Yield (key, value start) of every member of the
+        container opening at position, key is None for
+        arrays. The consumer reports where each value
+        ends through self._end.
+        """
+        source, start = self._source, position
+        position = self._space(position + 1)
+        if source.startswith(close, position):
+            self._end = position + 1
+            return
+        while True:
+            key = None
+            if close == "}":
+                if (m := _SCALAR.match(source, position)) is None or m[0][0] != '"':
+                    if source.startswith('"', position):
+                        line = _location(source, position)[0]
+                        raise _scan_error(source, position, line)
+                    line, column = _location(source, position)
+                    raise KeyError(
+                        f"Expected map key to be a string, found {self._found(position)} on line {line} column {column}"
+                    )
+                key, position = unquote(m[0]), self._space(m.end())
+                if not source.startswith(":", position):
+                    line, column = _location(source, position)
+                    raise MissingToken(
+                        f"Expected a colon as key-value separator in mapping on line {line} column {column}"
+                    )
+                position = self._space(position + 1)
+            yield key, position
+            position = self._space(self._end)
+            if source.startswith(",", position):
+                position = self._space(position + 1)
+            elif source.startswith(close, position):
+                self._end = position + 1
+                return
+            else:
+                line, column = _location(source, start)
+                raise MissingToken(
+                    f"Container opened at line {line} column {column} was never closed."
+                )
+
+    def walk(self, position: int, depth: int = 0) -> int:
+        """
+        Collect the matches of steps[depth:] in the value
+        starting at position, returns where the value ends.
+        """
+        if depth == len(self._steps):
+            end = self._skip(position)
+            line, column = self._where(position)
+            self.matches.append(_decode(self._source[position:end], line, column))
+            return end
+        step, source = self._steps[depth], self._source
+        close = _CLOSE.get(source[position : position + 1])
+        if close is None or step is not None and (close == "}") != (type(step) is str):
+            return self._skip(position)
+        targets: list[int] = []
+        for index, (key, start) in enumerate(self._members(position, close)):
+            if step is None:
+                self._end = self.walk(start, depth + 1)
+                continue
+            if key == step or index == step:
+                # Later duplicate keys win, as in loads
+                targets[:] = (start,)
+            elif type(step) is int and step < 0:
+                targets.append(start)
+            self._end = self._skip(start)
+        end = self._end
+        if type(step) is int and step < 0:
+            targets = targets[step:][:1] if len(targets) >= -step else []
+        for start in targets:
+            self.walk(start, depth + 1)
+        return end
+
+
+def _decode(text: str, line: int, column: int) -> BaseTypes:
+    """text, a fragment starting at line and column of the source."""
+    value = DirectParser(FastLexer(text).compact(line, column)).parse_value()
+    if isinstance(value, Exception):
+        raise value.result
+    return value.result
+
+
+def select(source: str, path: str) -> list[BaseTypes]:
+    """
+    Decode only the values at path, a JSONPath subset:
+    $ is the root, .key, ["key"] (with JSON escapes) and
+    ['key'] select a member, [n] an array item (negative
+    counts from the end), .* and [*] every member or item.
+
+        >>> select('{"items": [{"id": 1}, {"id": 2}]}', "$.items[*].id")
+        [1, 2]
+
+    Everything else is skipped by balancing brackets
+    over the raw text, no tokens are built for it, so
+    skipped parts are only checked for structure.
+    """
+    selector = _Selector(source, _compile(path))
+    end = _SPACE.match(source, selector.walk(_SPACE.match(source).end())).end()
+    if end < len(source):
+        line, column = _location(source, end)
+        m = source[end] not in "[{" and _SCALAR.match(source, end)
+        found = m[0] if m else source[end]
+        raise MultiRootObjects(
+            f"Expected one root object. line {line} column {column}: {found}"
+        )
+    return selector.matches
@@ -0,0 +1,453 @@
+"""
+Schema directed decoding.
+
+    @dataclass
+    class Point:
+        x: float
+        y: float
+        label: str | None = None
+
+    loads_as('[{"x": 1, "y": 2.5}]', list[Point])
+
+A target is a dataclass, a TypedDict, a JSON Schema (the
+subset Schema lists), or list[T], tuple[T, ...], dict[str,
+T] and unions of targets, int, float, str, bool, None and
+Any. It is compiled once into readers that consume the
+token stream and build the target objects directly, no
+dict or list is built in between and the values of fields
+the target does not have are skipped unbuilt. A value that
+does not fit raises SchemaError with its path as soon as
+its first token is read.
+"""
+from .exc import SchemaError, ParserError, MissingToken, InvalidRoot, MultiRootObjects
+from .parser import DirectParser, _string
+from .json import Buffer, _lexer
+from .strings import quote
+from .token import Token, TokenType
+import dataclasses
+import typing as ty
+import types
+import re
+
+__all__ = "Schema", "loads_as"
+
+T = ty.TypeVar("T")
+Path = list[str | int]
+Read = ty.Callable[["_SchemaParser", Path], ty.Any]
+# The kinds of token a value can start with, and how to read it
+Reader = tuple[frozenset[TokenType], Read]
+
+_LEFT_BRACE, _RIGHT_BRACE = TokenType.LEFT_BRACE, TokenType.RIGHT_BRACE
+_LEFT_BRAKET, _RIGHT_BRAKET = TokenType.LEFT_BRAKET, TokenType.RIGHT_BRAKET
+_COMMA, _STRING = TokenType.COMMA, TokenType.STRING
+_SCALARS = frozenset(
+    {
+        TokenType.STRING,
+        TokenType.INTEGER,
+        TokenType.FLOAT,
+        TokenType.TRUE,
+        TokenType.FALSE,
+        TokenType.NULL,
+    }
+)
+_VALUES = _SCALARS | {_LEFT_BRACE, _LEFT_BRAKET}
+_NAME = re.compile(r"[A-Za-z_][\w-]*")
+_QUALIFIERS = ty.Required, ty.NotRequired, ty.Annotated
+
+
+def _path(path: Path) -> str:
+    steps = ["$"]
+    for step in path:
+        if isinstance(step, int):
+            steps.append(f"[{step}]")
+        elif _NAME.fullmatch(step):
+            steps.append("." + step)
+        else:
+            steps.append(f"[{quote(step)}]")
+    return "".join(steps)
+
+
+def _mismatch(expected: str, token: Token, path: Path) -> SchemaError:
+    found = token.lexeme or "the end of the document"
+    return SchemaError(
+        f"Expected {expected}, found {found} on line {token.line} column {token.column}",
+        _path(path),
+    )
+
+
+class _SchemaParser(DirectParser):
+    """DirectParser with what the readers need on top."""
+
+    def skip(self) -> None:
+        """
+        Consume one value of any nesting depth, checked
+        as consume_value does, without building it.
+        """
+        # Opening tokens of the containers left to close
+        stack: list[Token] = []
+        while True:
+            token = self.peek()
+            kind = token.token_type
+            if kind is _LEFT_BRACE or kind is _LEFT_BRAKET:
+                self.advance()
+                if not self.match(_RIGHT_BRACE if kind is _LEFT_BRACE else _RIGHT_BRAKET):
+                    stack.append(token)
+                    if kind is _LEFT_BRACE:
+                        self.consume_key()
+                    continue
+            elif kind in _SCALARS:
+                self.advance()
+            else:
+                self.consume_scalar()  # Raises the error loads would
+            while stack:
+                if self.match(_COMMA):
+                    if stack[-1].token_type is _LEFT_BRACE:
+                        self.consume_key()
+                    break
+                self.close(stack.pop())
+            else:
+                return
+
+    def close(self, opening: Token) -> None:
+        """Consume the closing bracket of the container opening opened."""
+        if opening.token_type is _LEFT_BRACE:
+            if not self.match(_RIGHT_BRACE):
+                raise MissingToken(
+                    f"Mapping opened at line {opening.line} column {opening.column} was never closed."
+                )
+        elif not self.match(_RIGHT_BRAKET):
+            f = self.peek()
+            raise MissingToken(
+                f"Expected closing square bracket to close array on line {f.line} column {f.column}"
+            )
+
+    def read(self, read: Read) -> ty.Any:
+        """The root value, read by read."""
+        try:
+            return self._read_root(read)
+        except ParserError as e:
+            raise self.lexed(e)
+
+    def _read_root(self, read: Read) -> ty.Any:
+        self._pull()
+        f = self.peek()
+        if f.token_type is _LEFT_BRACE or f.token_type is _LEFT_BRAKET:
+            value = read(self, [])
+        elif self.empty():
+            raise InvalidRoot(
+                f"Expected root object to be a mapping or an array, found {f.lexeme}"
+            )
+        if not self.empty():
+            f = self.peek()
+            raise MultiRootObjects(
+                f"Expected one root object. line {f.line} column {f.column}: {f.lexeme}"
+            )
+        return value
+
+
+def _scalar(expected: str, kinds: set[TokenType], convert: ty.Callable) -> Reader:
+    def read(parser: _SchemaParser, path: Path) -> ty.Any:
+        token = parser.peek()
+        if token.token_type not in kinds:
+            raise _mismatch(expected, token, path)
+        parser.advance()
+        return convert(token)
+
+    return frozenset(kinds), read
+
+
+_PRIMITIVES: dict[ty.Any, Reader] = {
+    int: _scalar("an integer", {TokenType.INTEGER}, lambda token: int(token.lexeme)),
+    float: _scalar(
+        "a number",
+        {TokenType.INTEGER, TokenType.FLOAT},
+        lambda token: float(token.lexeme),
+    ),
+    str: _scalar("a string", {_STRING}, _string),
+    bool: _scalar(
+        "a boolean",
+        {TokenType.TRUE, TokenType.FALSE},
+        lambda token: token.token_type is TokenType.TRUE,
+    ),
+    None: _scalar("null", {TokenType.NULL}, lambda token: None),
+    ty.Any: (_VALUES, lambda parser, path: parser.consume_value()),
+}
+
+
+def _array(expected: str, item: Reader, build: ty.Callable | None = None) -> Reader:
+    _, read_item = item
+
+    def read(parser: _SchemaParser, path: Path) -> ty.Any:
+        opening = parser.peek()
+        if opening.token_type is not _LEFT_BRAKET:
+            raise _mismatch(expected, opening, path)
+        parser.advance()
+        items: list = []
+        if not parser.match(_RIGHT_BRAKET):
+            path.append(0)
+            while True:
+                items.append(read_item(parser, path))
+                if not parser.match(_COMMA):
+                    break
+                path[-1] = len(items)
+            path.pop()
+            parser.close(opening)
+        return items if build is None else build(items)
+
+    return frozenset({_LEFT_BRAKET}), read
+
+
+def _skip(parser: _SchemaParser, path: Path) -> None:
+    parser.skip()
+
+
+def _object(
+    expected: str,
+    fields: dict[str, Reader],
+    required: ty.AbstractSet[str] = frozenset(),
+    build: ty.Callable[[dict], ty.Any] | None = None,
+    extra: Read | None = _skip,
+) -> Reader:
+    """
+    fields are read into a dict, keys the schema does
+    not name by extra, skipped by default. Without extra
+    such keys fail.
+    """
+    readers = {key: read for key, (_, read) in fields.items()}
+    required = frozenset(required)
+
+    def read(parser: _SchemaParser, path: Path) -> ty.Any:
+        opening = parser.peek()
+        if opening.token_type is not _LEFT_BRACE:
+            raise _mismatch(expected, opening, path)
+        parser.advance()
+        values: dict[str, ty.Any] = {}
+        if not parser.match(_RIGHT_BRACE):
+            while True:
+                key = parser.consume_key()
+                path.append(key)
+                reader = readers.get(key, extra)
+                if reader is _skip:
+                    parser.skip()
+                elif reader is not None:
+                    values[key] = reader(parser, path)
+                else:
+                    raise SchemaError(f"Unexpected field {key!r} in {expected}", _path(path))
+                path.pop()
+                if not parser.match(_COMMA):
+                    break
+            parser.close(opening)
+        if not required <= values.keys():
+            missing = min(required - values.keys())
+            raise SchemaError(
+                f"Missing field {missing!r} in {expected} opened on line "
+                f"{opening.line} column {opening.column}",
+                _path(path),
+            )
+        return values if build is None else build(values)
+
+    return frozenset({_LEFT_BRACE}), read
+
+
+def _union(expected: str, members: list[Reader]) -> Reader:
+    """
+    A reader per kind of token. The member accepting the
+    fewest kinds of token wins, int over float and any
+    member over Any, others may not overlap.
+    """
+    table: dict[TokenType, Read] = {}
+    claimed: dict[TokenType, int] = {}
+    for kinds, read in sorted(members, key=lambda member: len(member[0])):
+        for kind in kinds:
+            if kind not in table:
+                table[kind], claimed[kind] = read, len(kinds)
+            elif claimed[kind] == len(kinds) and table[kind] is not read:
+                raise TypeError(f"Union members of {expected} both accept {kind}")
+
+    def read(parser: _SchemaParser, path: Path) -> ty.Any:
+        token = parser.peek()
+        reader = table.get(token.token_type)
+        if reader is None:
+            raise _mismatch(expected, token, path)
+        return reader(parser, path)
+
+    return frozenset(table), read
+
+
+def _recursive(target: ty.Any, compile: ty.Callable[[], Reader], seen: dict) -> Reader:
+    """
+    compile() for a target that may refer to itself, the
+    references made while compiling go through a stub.
+    """
+    compiled: list[Read] = []
+    seen[target] = frozenset({_LEFT_BRACE}), lambda parser, path: compiled[0](parser, path)
+    reader = compile()
+    compiled.append(reader[1])
+    seen[target] = reader
+    return reader
+
+
+def _dataclass(cls: type, seen: dict) -> Reader:
+    def compile() -> Reader:
+        hints = ty.get_type_hints(cls)
+        fields, required = {}, set()
+        for field in dataclasses.fields(cls):
+            if not field.init:
+                continue
+            fields[field.name] = _compile(hints[field.name], seen)
+            if field.default is field.default_factory is dataclasses.MISSING:
+                required.add(field.name)
+        return _object(f"a {cls.__name__}", fields, required, lambda values: cls(**values))
+
+    return _recursive(cls, compile, seen)
+
+
+def _typeddict(cls: type, seen: dict) -> Reader:
+    def compile() -> Reader:
+        # Required and NotRequired are read off the hints, string
+        # annotations leave them out of __required_keys__.
+        fields, required = {}, set(cls.__required_keys__)  # type: ignore[attr-defined]
+        for key, hint in ty.get_type_hints(cls, include_extras=True).items():
+            while (origin := ty.get_origin(hint)) in _QUALIFIERS:
+                if origin is ty.Required:
+                    required.add(key)
+                elif origin is ty.NotRequired:
+                    required.discard(key)
+                hint = ty.get_args(hint)[0]
+            fields[key] = _compile(hint, seen)
+        return _object(f"a {cls.__name__}", fields, required)
+
+    return _recursive(cls, compile, seen)
+
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": None,
+}
+
+
+def _json_schema(schema: dict, seen: dict) -> Reader:
+    """
+    The JSON Schema keywords type, a name or a list of
+    them, properties, required, additionalProperties,
+    items and enum. Anything else is ignored.
+    """
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        members = [_json_schema({**schema, "type": name}, seen) for name in kind]
+        reader = _union(" or ".join(kind), members)
+    elif kind == "object" or kind is None and "properties" in schema:
+        properties = {
+            key: _json_schema(value, seen)
+            for key, value in schema.get("properties", {}).items()
+        }
+        extra = schema.get("additionalProperties", True)
+        if isinstance(extra, dict):
+            extra = _json_schema(extra, seen)[1]
+        reader = _object(
+            "an object",
+            properties,
+            schema.get("required", ()),
+            extra=_skip if extra is True else extra or None,
+        )
+    elif kind == "array":
+        reader = _array("an array", _json_schema(schema.get("items", {}), seen))
+    elif kind is None:
+        reader = _PRIMITIVES[ty.Any]
+    elif kind in _JSON_TYPES:
+        reader = _PRIMITIVES[_JSON_TYPES[kind]]
+    else:
+        raise TypeError(f"Unknown JSON Schema type {kind!r}")
+    if "enum" not in schema:
+        return reader
+    allowed, (kinds, read) = list(schema["enum"]), reader
+
+    def read_enum(parser: _SchemaParser, path: Path) -> ty.Any:
+        token = parser.peek()
+        value = read(parser, path)
+        if value not in allowed:
+            raise _mismatch(f"one of {allowed}", token, path)
+        return value
+
+    return kinds, read_enum
+
+
+def _compile(target: ty.Any, seen: dict) -> Reader:
+    if isinstance(target, dict):
+        return _json_schema(target, seen)
+    if target is type(None):
+        target = None
+    if target in seen:
+        return seen[target]
+    if target in _PRIMITIVES:
+        return _PRIMITIVES[target]
+    origin, args = ty.get_origin(target), ty.get_args(target)
+    if origin is ty.Union or origin is types.UnionType:
+        members = [_compile(arg, seen) for arg in args]
+        return _union(" or ".join(map(_describe, args)), members)
+    if target is list or origin is list:
+        return _array("an array", _compile(args[0] if args else ty.Any, seen))
+    if origin is tuple and len(args) == 2 and args[1] is Ellipsis:
+        return _array("an array", _compile(args[0], seen), tuple)
+    if target is dict or origin is dict:
+        if args and args[0] is not str:
+            raise TypeError(f"Mapping keys are strings, not {args[0]!r}")
+        item = _compile(args[1] if args else ty.Any, seen)
+        return _object("an object", {}, extra=item[1])
+    if isinstance(target, type) and dataclasses.is_dataclass(target):
+        return _dataclass(target, seen)
+    if ty.is_typeddict(target):
+        return _typeddict(target, seen)
+    raise TypeError(f"Can not decode into {target!r}")
+
+
+def _describe(target: ty.Any) -> str:
+    if target is type(None):
+        return "null"
+    return getattr(target, "__name__", None) or str(target)
+
+
+class Schema(ty.Generic[T]):
+    """
+    target compiled for decoding. Compiling walks the
+    whole target, build a Schema once and keep it, or
+    let loads_as keep one per target.
+    """
+
+    def __init__(self, target: ty.Any) -> None:
+        self.target = target
+        self._read = _compile(target, {})[1]
+
+    def decode(self, source: str | Buffer) -> T:
+        return _SchemaParser(_lexer(source, None).stream()).read(self._read)
+
+
+_SCHEMAS: dict[ty.Any, Schema] = {}
+
+
+@ty.overload
+def loads_as(source: str | Buffer, target: type[T]) -> T:
+    ...
+
+
+@ty.overload
+def loads_as(source: str | Buffer, target: ty.Any) -> ty.Any:
+    ...
+
+
+def loads_as(source, target):
+    """
+    Decode source into target, compiled on first use. A
+    JSON Schema, being a dict, is compiled every time,
+    keep a Schema of it instead.
+    """
+    if isinstance(target, dict):
+        return Schema(target).decode(source)
+    try:
+        schema = _SCHEMAS[target]
+    except KeyError:
+        schema = _SCHEMAS[target] = Schema(target)
+    return schema.decode(source)
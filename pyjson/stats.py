@@ -0,0 +1,202 @@
+"""
+Opt-in instrumentation for loads and dumps.
+
+    stats = Stats()
+    loads(source, stats=stats)
+    stats.phases["parse"].seconds
+
+Or for every call, to forward to a metrics system:
+
+    add_hook(lambda stats: metrics.update(stats.counters()))
+
+Calls with neither a Stats nor a hook take the usual fast
+path, the only cost is checking for them. Instrumented
+calls take the same path, tokens, parser and all, with
+the lexer timed as the parser pulls each token, so values
+and errors are those of an uninstrumented call. Without a
+composer the parser builds the values itself, its phase
+holds what compose does otherwise.
+"""
+from .token import Token, TokenType
+import typing as ty
+import time
+import sys
+
+__all__ = "Phase", "Stats", "add_hook", "remove_hook"
+
+Hook = ty.Callable[["Stats"], None]
+_hooks: list[Hook] = []
+
+_OPENERS = TokenType.LEFT_BRACE, TokenType.LEFT_BRAKET
+_CLOSERS = TokenType.RIGHT_BRACE, TokenType.RIGHT_BRAKET
+_SCALARS = (
+    TokenType.STRING,
+    TokenType.INTEGER,
+    TokenType.FLOAT,
+    TokenType.TRUE,
+    TokenType.FALSE,
+    TokenType.NULL,
+)
+
+
+class Phase(ty.NamedTuple):
+    # Wall time, and memory blocks still allocated at its end
+    # that were not before, sys.getallocatedblocks, net of frees
+    seconds: float
+    blocks: int
+
+
+class Stats:
+    """
+    What one loads or dumps call did. nodes counts values,
+    mapping keys excluded, max_depth the deepest nesting of
+    containers. error is the exception the call raised, the
+    phases it got through are still there.
+    """
+
+    def __init__(self) -> None:
+        self.operation = ""
+        self.bytes = 0
+        self.tokens = 0
+        self.nodes = 0
+        self.max_depth = 0
+        self.phases: dict[str, Phase] = {}
+        self.error: Exception | None = None
+
+    def __repr__(self) -> str:
+        phases = ", ".join(
+            f"{name}={phase.seconds * 1e3:.3f}ms" for name, phase in self.phases.items()
+        )
+        return (
+            f"Stats({self.operation}, bytes={self.bytes}, tokens={self.tokens}, "
+            f"nodes={self.nodes}, max_depth={self.max_depth}, {phases})"
+        )
+
+    @property
+    def seconds(self) -> float:
+        return sum(phase.seconds for phase in self.phases.values())
+
+    def counters(self) -> dict[str, float]:
+        """Flat names to numbers, ready for a metrics system."""
+        prefix = self.operation + "."
+        counters: dict[str, float] = {
+            prefix + "bytes": self.bytes,
+            prefix + "nodes": self.nodes,
+            prefix + "max_depth": self.max_depth,
+            prefix + "seconds": self.seconds,
+            prefix + "errors": self.error is not None,
+        }
+        if self.tokens:
+            counters[prefix + "tokens"] = self.tokens
+        for name, phase in self.phases.items():
+            counters[f"{prefix}{name}.seconds"] = phase.seconds
+            counters[f"{prefix}{name}.blocks"] = phase.blocks
+        return counters
+
+    def start(self, operation: str, size: int) -> None:
+        """Forget the previous call, a Stats may be reused."""
+        self.operation, self.bytes = operation, size
+        self.tokens = self.nodes = self.max_depth = 0
+        self.phases = {}
+        self.error = None
+
+    def _totals(self) -> tuple[float, int]:
+        phases = self.phases.values()
+        return sum(p.seconds for p in phases), sum(p.blocks for p in phases)
+
+    def _add(self, phase: str, seconds: float, blocks: int) -> None:
+        if (previous := self.phases.get(phase)) is not None:
+            seconds, blocks = seconds + previous.seconds, blocks + previous.blocks
+        self.phases[phase] = Phase(seconds, blocks)
+
+    def time(self, phase: str, step: ty.Callable, *args) -> ty.Any:
+        """
+        step(*args), added to phase, less what the phases
+        timed within it took.
+        """
+        clock, blocks = time.perf_counter, sys.getallocatedblocks
+        nested_seconds, nested_blocks = self._totals()
+        before = blocks()
+        start = clock()
+        try:
+            return step(*args)
+        finally:
+            seconds, allocated = clock() - start, blocks() - before
+            inner_seconds, inner_blocks = self._totals()
+            self._add(
+                phase,
+                seconds - inner_seconds + nested_seconds,
+                allocated - inner_blocks + nested_blocks,
+            )
+
+    def lex(self, tokens: ty.Iterable[Token]) -> ty.Generator[Token, None, None]:
+        """
+        tokens as they are pulled, the time spent producing
+        them added to the lex phase when closed, counting
+        tokens, nodes and max_depth on the way. Their blocks
+        count towards the phase pulling them, looking at
+        sys.getallocatedblocks per token costs more than
+        lexing it.
+        """
+        clock = time.perf_counter
+        pull = iter(tokens).__next__
+        seconds = 0.0
+        count = nodes = depth = deepest = 0
+        try:
+            while True:
+                start = clock()
+                try:
+                    token = pull()
+                except StopIteration:
+                    return
+                finally:
+                    seconds += clock() - start
+                kind = token.token_type
+                if kind in _SCALARS:
+                    nodes += 1
+                elif kind in _OPENERS:
+                    nodes += 1
+                    depth += 1
+                    if depth > deepest:
+                        deepest = depth
+                elif kind in _CLOSERS:
+                    depth -= 1
+                elif kind is TokenType.COLON:
+                    nodes -= 1  # The key before it is not a value
+                if kind is not TokenType.EOF:
+                    count += 1
+                yield token
+        finally:
+            self._add("lex", seconds, 0)
+            self.tokens, self.nodes, self.max_depth = count, nodes, deepest
+
+    def count_values(self, root) -> None:
+        """
+        nodes and max_depth of a Python object the encoder
+        accepted, so one without cycles.
+        """
+        nodes = deepest = 0
+        stack = [(root, 0)]
+        while stack:
+            value, depth = stack.pop()
+            nodes += 1
+            kind = type(value)
+            if kind is list or kind is dict:
+                depth += 1
+                deepest = max(deepest, depth)
+                items = value.values() if kind is dict else value
+                stack.extend((item, depth) for item in items)
+        self.nodes, self.max_depth = nodes, deepest
+
+    def report(self) -> None:
+        for hook in _hooks:
+            hook(self)
+
+
+def add_hook(hook: Hook) -> None:
+    """Have hook called with the Stats of every loads and dumps."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    _hooks.remove(hook)
@@ -0,0 +1,67 @@
+import re
+
+__all__ = "quote", "unquote"
+
+_ESCAPE = re.compile(
+    r"""
+    \\(?:
+        u([dD][89abAB][0-9a-fA-F]{2})\\u([dD][c-fC-F][0-9a-fA-F]{2})
+        | u([0-9a-fA-F]{4})
+        | (.)
+    )
+    """,
+    re.VERBOSE,
+)
+_UNSAFE = re.compile('[\x00-\x1f"\\\\\ud800-\udfff]')
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_ESCAPES = {char: "\\" + escape for escape, char in _SIMPLE_ESCAPES.items()}
+del _ESCAPES["/"]
+
+
+def _unescape(match: re.Match) -> str:
+    high, low, code, char = match.groups()
+    if high is not None:
+        return chr(0x10000 + (int(high, 16) - 0xD800 << 10) + int(low, 16) - 0xDC00)
+    if code is not None:
+        return chr(int(code, 16))
+    return _SIMPLE_ESCAPES[char]
+
+
+def unquote(lexeme: str) -> str:
+    """
+    The text of a string lexeme the lexers accepted,
+    quotes stripped and escapes resolved. A surrogate
+    pair becomes one character, a lone surrogate stays.
+    """
+    if "\\" not in lexeme:
+        return lexeme[1:-1]
+    return _ESCAPE.sub(_unescape, lexeme[1:-1])
+
+
+def _escape(match: re.Match) -> str:
+    char = match[0]
+    return _ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+
+def quote(text: str) -> str:
+    """
+    text as a string lexeme. Quotes, backslashes, control
+    characters and lone surrogates are escaped, anything
+    else, non-ASCII included, is written as is.
+    """
+    # isprintable rules out control characters and surrogates,
+    # it is cheaper than the search, which settles the rest.
+    if text.isprintable() and '"' not in text and "\\" not in text:
+        return '"' + text + '"'
+    if _UNSAFE.search(text) is None:
+        return '"' + text + '"'
+    return '"' + _UNSAFE.sub(_escape, text) + '"'
@@ -1,6 +1,10 @@
+from array import array
+import typing as ty
+import itertools
+import bisect
 import enum
 
-__all__ = "TokenType", "Token"
+__all__ = "TokenType", "Token", "TokenBuffer"
 
 
 class TokenType(enum.StrEnum):
@@ -8,21 +12,21 @@ class TokenType(enum.StrEnum):
     RIGHT_BRACE = enum.auto()
     LEFT_BRAKET = enum.auto()
     LEFT_BRACE = enum.auto()
-    NUMBER = enum.auto()
+    INTEGER = enum.auto()
     STRING = enum.auto()
     QUOTE = enum.auto()
-    MINUS = enum.auto()
+    FLOAT = enum.auto()
     FALSE = enum.auto()
     COLON = enum.auto()
     COMMA = enum.auto()
     NULL = enum.auto()
     TRUE = enum.auto()
     EOF = enum.auto()
-    DOT = enum.auto()
-    E = enum.auto()
 
 
 class Token:
+    __slots__ = "token_type", "lexeme", "column", "line"
+
     def __init__(
         self, *, token_type: TokenType, column: int, line: int, lexeme: str
     ) -> None:
@@ -38,3 +42,94 @@ class Token:
         )
 
     __repr__ = __str__
+
+
+_KINDS = tuple(TokenType)
+_CODES = {token_type: index for index, token_type in enumerate(_KINDS)}
+
+
+class TokenView:
+    """
+    Token read on demand out of a TokenBuffer, the
+    type, the lexeme and the location are all looked
+    up only when asked for. Two slots, a Token has four.
+    """
+
+    __slots__ = "_buffer", "_index"
+
+    def __init__(self, buffer: "TokenBuffer", index: int) -> None:
+        self._buffer = buffer
+        self._index = index
+
+    @property
+    def token_type(self) -> TokenType:
+        return _KINDS[self._buffer.kinds[self._index]]
+
+    @property
+    def lexeme(self) -> str:
+        return self._buffer.lexeme(self._index)
+
+    @property
+    def line(self) -> int:
+        return self._buffer.location(self._buffer.starts[self._index])[0]
+
+    @property
+    def column(self) -> int:
+        return self._buffer.location(self._buffer.starts[self._index])[1]
+
+    __str__ = __repr__ = Token.__str__
+
+
+class TokenBuffer:
+    """
+    Compact token stream, the kind of every token and
+    its source offsets live in parallel arrays instead
+    of one Token object per token. Lines and columns
+    are worked out from the offsets only when needed,
+    indexing or iterating yields Token views. line and
+    column are where source starts, for a fragment of a
+    larger document.
+    """
+
+    def __init__(self, source: str, line: int = 1, column: int = 0) -> None:
+        offset = "I" if len(source) < 1 << 32 else "Q"
+        self.starts = array(offset)
+        self.ends = array(offset)
+        self.kinds = array("B")
+        self.source = source
+        self._newlines: array | None = None
+        self._line = line
+        self._column = column
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> TokenView:
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self) -> ty.Iterator[TokenView]:
+        return map(TokenView, itertools.repeat(self), range(len(self.kinds)))
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def location(self, offset: int) -> tuple[int, int]:
+        """
+        Line and column of offset, counted the way Lexer
+        does: the column of a character on a later line
+        is its distance from the preceding newline.
+        """
+        if self._newlines is None:
+            self._newlines = array(self.starts.typecode)
+            position = self.source.find("\n")
+            while position != -1:
+                self._newlines.append(position)
+                position = self.source.find("\n", position + 1)
+        before = bisect.bisect_left(self._newlines, offset)
+        if not before:
+            return self._line, self._column + offset
+        return self._line + before, offset - self._newlines[before - 1]